@@ -0,0 +1,224 @@
+import time
+import json
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+
+from datetime import datetime, timezone
+
+import httpx
+
+from src.app.api.v1.app import create_app
+from src.config.services import Services
+from src.settings import get_settings
+
+ROUTES = {
+    "login": 0.05,
+    "create": 0.30,
+    "get": 0.40,
+    "list": 0.15,
+    "update": 0.10,
+}
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, requests: int, concurrency: int, seed: int):
+        self.client = client
+        self.requests = requests
+        self.concurrency = concurrency
+        self.random = random.Random(seed)
+
+        self.username = f"bench-{seed}-{int(time.time())}"
+        self.password = "bench-password"
+        self.headers: dict[str, str] = {}
+        self.task_ids: list[str] = []
+
+        self.latencies: dict[str, list[float]] = {route: [] for route in ROUTES}
+        self.errors: dict[str, int] = {route: 0 for route in ROUTES}
+
+    async def setup(self):
+        await self.client.post("/users/register", json={
+            "username": self.username,
+            "password": self.password,
+            "role": "admin",
+        })
+        await self.login()
+
+        for _ in range(self.concurrency):
+            await self.create()
+
+        # get and update pick from the tasks created here
+        if not self.task_ids:
+            raise RuntimeError("setup could not create any tasks; check that the server accepts the bench user")
+
+    def task_payload(self) -> dict:
+        return {
+            "title": f"task {self.random.randrange(1_000_000)}",
+            "description": "load test",
+            "status": self.random.choice(["todo", "in_progress", "done"]),
+            "created_at": time.time(),
+            "city": self.random.choice(["Moscow", "Berlin", "Paris", None]),
+        }
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post("/users/login", data={
+            "username": self.username,
+            "password": self.password,
+        })
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def create(self) -> httpx.Response:
+        task_id = None
+        response = await self.client.post("/tasks/create_tasks", json=[self.task_payload()], headers=self.headers)
+        if response.status_code == 200:
+            task_id = response.json()["ids"][0]
+            self.task_ids.append(task_id)
+        return response
+
+    async def get(self) -> httpx.Response:
+        return await self.client.get(f"/tasks/get_task/{self.random.choice(self.task_ids)}", headers=self.headers)
+
+    async def list_tasks(self) -> httpx.Response:
+        return await self.client.get("/tasks/get_all", params={"limit": 50}, headers=self.headers)
+
+    async def update(self) -> httpx.Response:
+        return await self.client.patch(
+            f"/tasks/update/{self.random.choice(self.task_ids)}",
+            json={"status": self.random.choice(["todo", "in_progress", "done"])},
+            headers=self.headers
+        )
+
+    async def worker(self, budget: list[int]):
+        routes = list(ROUTES)
+        weights = list(ROUTES.values())
+        handlers = {
+            "login": self.login,
+            "create": self.create,
+            "get": self.get,
+            "list": self.list_tasks,
+            "update": self.update,
+        }
+
+        while budget[0] > 0:
+            budget[0] -= 1
+            route = self.random.choices(routes, weights)[0]
+
+            started = time.perf_counter()
+            try:
+                response = await handlers[route]()
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            self.latencies[route].append(time.perf_counter() - started)
+
+            if failed:
+                self.errors[route] += 1
+
+    async def run(self) -> dict:
+        await self.setup()
+
+        budget = [self.requests]
+        started = time.perf_counter()
+        await asyncio.gather(*(self.worker(budget) for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        routes = {}
+        for route, samples in self.latencies.items():
+            routes[route] = {
+                "requests": len(samples),
+                "errors": self.errors[route],
+                "throughput_rps": round(len(samples) / elapsed, 1),
+                "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                "p95_ms": round(percentile(samples, 95) * 1000, 3),
+                "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            }
+
+        return {
+            "seconds": round(elapsed, 3),
+            "requests": self.requests,
+            "throughput_rps": round(self.requests / elapsed, 1),
+            "routes": routes,
+        }
+
+
+def memory_services() -> Services:
+    from benchmarks.memory_db import InMemoryDatabase
+
+    # a single benchmark client would spend most of the run on 429s; lift the limits, not the checks
+    unlimited = 10**9
+    settings = get_settings().model_copy(update={
+        f"RATE_LIMIT_{scope}_{kind}": unlimited for scope in ("AUTH", "IP", "USER") for kind in ("PER_MINUTE", "BURST")
+    })
+
+    services = Services(settings)
+    services.db = InMemoryDatabase()
+    return services
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent route mix load test for the task API")
+    parser.add_argument("--backend", choices=["postgres", "memory"], default="memory",
+                        help="run the app in-process against DATABASE_URI or against an in-memory stand-in")
+    parser.add_argument("--base-url", default=None,
+                        help="drive an already running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+        async with client:
+            result = await LoadTest(client, args.requests, args.concurrency, args.seed).run()
+    elif args.backend == "memory":
+        services = memory_services()
+        app = create_app(services=services)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+        async with client:
+            result = await LoadTest(client, args.requests, args.concurrency, args.seed).run()
+        await services.db.shutdown()
+    else:
+        app = create_app()
+        async with app.router.lifespan_context(app):
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+            async with client:
+                result = await LoadTest(client, args.requests, args.concurrency, args.seed).run()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "backend": "remote" if args.base_url else args.backend,
+        "concurrency": args.concurrency,
+        **result,
+    }
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+import time
+import json
+import asyncio
+import argparse
+
+from src.utils.hashing import PasswordHasher
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(rounds: int, workers: int, logins: int, concurrency: int) -> dict:
+    hasher = PasswordHasher(rounds=rounds, workers=workers)
+    password_hash = await hasher.hash("benchmark-password")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            await hasher.verify("benchmark-password", password_hash)
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(measure_loop_lag(stop))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    worst_lag = await lag
+    hasher.shutdown()
+
+    return {
+        "rounds": rounds,
+        "workers": workers,
+        "logins": logins,
+        "seconds": round(elapsed, 3),
+        "logins_per_second": round(logins / elapsed, 1),
+        "max_event_loop_lag_ms": round(worst_lag * 1000, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Login (password verify) throughput per hashing pool size")
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        print(json.dumps(await run(args.rounds, workers, args.logins, args.concurrency)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
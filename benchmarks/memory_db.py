@@ -0,0 +1,112 @@
+import uuid
+
+from typing import Optional
+from datetime import datetime
+
+from src.database.errors import TaskNotFoundError, TaskAccessDeniedError, TaskVersionConflictError
+from src.utils.hashing import PasswordHasher
+from src.utils.data_time import dt_from_float
+from src.utils.pagination import encode_cursor, decode_cursor
+
+
+# stand-in for Database covering only the routes driven by benchmarks/load_test.py
+class InMemoryDatabase:
+    def __init__(self, hasher: Optional[PasswordHasher] = None):
+        self.hasher = hasher if hasher is not None else PasswordHasher(rounds=4)
+        self.users: dict[str, tuple] = {}
+        self.tasks: dict[uuid.UUID, dict] = {}
+
+    async def open(self):
+        pass
+
+    async def shutdown(self):
+        self.hasher.shutdown()
+
+    async def register_new_user(self, username: str, role, password: str) -> bool:
+        if username in self.users:
+            return False
+
+        password_hash = await self.hasher.hash(password)
+        self.users[username] = (uuid.uuid4(), username, role.value, password_hash, 0)
+        return True
+
+    async def auth_user(self, username: str, password: str):
+        user = self.users.get(username)
+        if user is None:
+            await self.hasher.dummy_verify()
+            return False
+
+        verified, _ = await self.hasher.verify(password, user[3])
+        return [user] if verified else False
+
+    async def create_task(self, id, user_id, title, description, status, created_at, city=None, weather=None):
+        self.tasks[id] = {
+            "id": id,
+            "user_id": user_id,
+            "title": title,
+            "description": description,
+            "status": status.value,
+            "created_at": dt_from_float(created_at),
+            "city": city,
+            "weather": weather,
+            "version": 1,
+        }
+        return "INSERT 0 1"
+
+    async def create_tasks(self, user_id, tasks: list) -> list[uuid.UUID]:
+        ids = []
+        for task in tasks:
+            task_id = uuid.uuid4()
+            await self.create_task(
+                task_id, user_id, task.title, task.description, task.status, task.created_at, task.city, task.weather
+            )
+            ids.append(task_id)
+        return ids
+
+    async def get_task_for_principal(self, task_id, user_id, is_admin: bool) -> dict:
+        task = self.tasks.get(task_id)
+        if task is None:
+            raise TaskNotFoundError(task_id)
+
+        if not (is_admin or task["user_id"] == user_id):
+            raise TaskAccessDeniedError(task_id)
+
+        return dict(task)
+
+    async def update_task_for_principal(self, task_id, fields: dict, user_id, is_admin: bool, version=None) -> dict:
+        task = self.tasks.get(task_id)
+        if task is None:
+            raise TaskNotFoundError(task_id)
+
+        if not (is_admin or task["user_id"] == user_id):
+            raise TaskAccessDeniedError(task_id)
+
+        if version is not None and task["version"] != version:
+            raise TaskVersionConflictError(task_id, task["version"])
+
+        if fields:
+            task.update(fields)
+            if fields.get("created_at") is not None:
+                task["created_at"] = dt_from_float(fields["created_at"])
+            task["version"] += 1
+
+        return dict(task)
+
+    async def sort_tasks(self, status=None, user=None, date=None, limit: int = 50, cursor: Optional[str] = None):
+        rows = sorted(self.tasks.values(), key=lambda task: (task["created_at"], task["id"]), reverse=True)
+
+        if status:
+            rows = [task for task in rows if task["status"] == status]
+        if user:
+            rows = [task for task in rows if str(task["user_id"]) == str(user)]
+        if date:
+            rows = [task for task in rows if task["created_at"] >= datetime.fromtimestamp(date)]
+        if cursor:
+            after = decode_cursor(cursor)
+            rows = [task for task in rows if (task["created_at"], task["id"]) < after]
+
+        if len(rows) <= limit:
+            return rows, None
+
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
@@ -0,0 +1,126 @@
+import time
+import json
+import uuid
+import random
+import asyncio
+import argparse
+
+from datetime import datetime, timedelta
+
+import asyncpg
+
+from src.database.migrations import upgrade
+from src.database.queries import build_task_search_query, prefix_tsquery
+from src.config.database_config import TASKS_COPY_COLUMNS
+
+WORDS = (
+    "report invoice meeting deploy review budget migrate design contract audit release backlog "
+    "customer support onboarding roadmap quarterly incident payroll analytics dashboard vendor "
+    "security training interview planning research prototype feedback hiring compliance"
+).split()
+CITIES = ("Moscow", "Berlin", "Paris", "London", "Madrid", None)
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))]
+
+
+async def seed(connection: asyncpg.Connection, user_id: uuid.UUID, rows: int, rng: random.Random):
+    now = datetime.now()
+    batch = 50_000
+
+    for start in range(0, rows, batch):
+        records = [
+            (
+                uuid.uuid4(),
+                user_id,
+                sentence(rng, rng.randint(2, 5)),
+                sentence(rng, rng.randint(8, 30)),
+                rng.choice(("todo", "in_progress", "done")),
+                now - timedelta(minutes=rng.randint(0, 525_600)),
+                rng.choice(CITIES),
+                None,
+            )
+            for _ in range(min(batch, rows - start))
+        ]
+        await connection.copy_records_to_table("tasks", records=records, columns=TASKS_COPY_COLUMNS)
+
+    await connection.execute("ANALYZE tasks")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Full-text task search latency on a synthetic dataset")
+    parser.add_argument("--dsn", required=True,
+                        help="scratch database to seed; never point this at a database serving traffic")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--candidates", type=int, default=1000, help="TASKS_SEARCH_CANDIDATES")
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic rows after the run")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    connection = await asyncpg.connect(dsn=args.dsn)
+    user_id = uuid.uuid4()
+
+    try:
+        await upgrade(connection)
+        # like partition moves, the seed and the cleanup bypass rollups and change notifications
+        await connection.execute("SELECT set_config('sobes.maintenance', 'on', false)")
+        await connection.execute(
+            "INSERT INTO users(id, username, role, password_hash) VALUES($1, $2, 'user', '-')",
+            user_id, f"search-bench-{user_id}"
+        )
+
+        started = time.perf_counter()
+        await seed(connection, user_id, args.rows, rng)
+        seeded = time.perf_counter() - started
+
+        searches = {
+            "text": ((), lambda: ()),
+            "text+status": (("status",), lambda: ("todo",)),
+            "text+user": (("user",), lambda: (user_id,)),
+        }
+
+        report = {"rows": args.rows, "seed_seconds": round(seeded, 1), "searches": {}}
+        for label, (filters, params) in searches.items():
+            _, _, query = build_task_search_query(filters)
+            statement = await connection.prepare(query)
+
+            samples = []
+            for _ in range(args.queries):
+                # prefixes and typos exercise both the tsvector and the trigram path
+                text = rng.choice(WORDS)
+                text = rng.choice((text, text[:4], text[:-1] + "x"))
+
+                started = time.perf_counter()
+                await statement.fetch(prefix_tsquery(text), text, *params(), args.candidates, 50, 0)
+                samples.append((time.perf_counter() - started) * 1000)
+
+            report["searches"][label] = {
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "within_budget": percentile(samples, 95) < args.budget_ms,
+            }
+
+        print(json.dumps(report, indent=2))
+
+        if not all(search["within_budget"] for search in report["searches"].values()):
+            raise SystemExit(1)
+
+    finally:
+        if not args.keep:
+            await connection.execute("DELETE FROM tasks WHERE user_id = $1", user_id)
+            await connection.execute("DELETE FROM users WHERE id = $1", user_id)
+        await connection.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,21 +1,67 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from src.app.api.v1.routers import auth
 from src.app.api.v1.routers import tasks
-from src.config.constants import db_init
+from src.app.api.v1.routers import health
+from src.app.api.v1.routers import analytics
+from src.app.api.v1.routers import changes
+from src.app.api.v1.routers import metrics as metrics_router
+from src.app.api.v1.middleware import TimingMiddleware
+from src.config.services import Services
+from src.settings import Settings, get_settings
+
+
+def create_app(settings: Optional[Settings] = None, services: Optional[Services] = None) -> FastAPI:
+    # each worker calls the factory once; services are built here and only connect in the lifespan
+    if services is None:
+        services = Services(settings if settings is not None else get_settings())
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await services.start()
+
+        try:
+            yield
+        finally:
+            await services.stop()
+
+    app = FastAPI(
+        description="Task's API",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+    app.state.services = services
+
+    tasks.register_jobs(services)
+
+    app.add_middleware(TimingMiddleware, metrics=services.metrics)
+
+    app.include_router(
+        auth.router
+    )
+
+    app.include_router(
+        tasks.router
+    )
+
+    app.include_router(
+        analytics.router
+    )
 
-app = FastAPI(
-    description="Task's API"
-)
+    app.include_router(
+        changes.router
+    )
 
-@app.on_event("startup")
-async def init():
-    await db_init.create_tables()
+    app.include_router(
+        health.router
+    )
 
-app.include_router(
-    auth.router
-)
+    app.include_router(
+        metrics_router.router
+    )
 
-app.include_router(
-    tasks.router
-)
\ No newline at end of file
+    return app
@@ -0,0 +1,91 @@
+import time
+
+from fastapi import Depends, Request, status
+from fastapi.exceptions import HTTPException
+from fastapi.security import OAuth2PasswordBearer
+from starlette.requests import HTTPConnection
+
+from pydantic import ValidationError
+
+from src.models.principal import Principal
+from src.utils.jwt import verify_access_token
+from src.utils.rate_limit import RateLimit, RateLimitExceeded
+from src.config.services import Services
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+def get_services(connection: HTTPConnection) -> Services:
+    return connection.app.state.services
+
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme),
+                                services: Services = Depends(get_services)) -> Principal:
+    return principal_from_token(token, services)
+
+
+def principal_from_token(token: str, services: Services) -> Principal:
+    started = time.perf_counter()
+    payload = verify_access_token(token, services.settings.SECRET)
+    services.metrics.observe_jwt(time.perf_counter() - started)
+
+    if not payload:
+        raise _unauthorized()
+
+    try:
+        principal = Principal(
+            user_id=payload.get("sub"),
+            role=payload.get("role"),
+            token_version=payload.get("ver", 0),
+            epoch=payload.get("epoch", 0)
+        )
+    except ValidationError:
+        raise _unauthorized()
+
+    if services.revocations.is_revoked(str(principal.user_id), principal.token_version, principal.epoch):
+        raise _unauthorized()
+
+    return principal
+
+
+async def require_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    if not principal.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
+
+    return principal
+
+
+async def _enforce(limit: RateLimit, identity: str):
+    try:
+        await limit.check(identity)
+    except RateLimitExceeded as exceeded:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": exceeded.retry_after_header},
+        )
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+async def limit_auth(request: Request, services: Services = Depends(get_services)):
+    await _enforce(services.auth_rate_limit, _client_ip(request))
+
+
+async def limit_by_ip(request: Request, services: Services = Depends(get_services)):
+    await _enforce(services.ip_rate_limit, _client_ip(request))
+
+
+async def limit_by_user(principal: Principal = Depends(get_current_principal),
+                        services: Services = Depends(get_services)):
+    await _enforce(services.user_rate_limit, str(principal.user_id))
@@ -0,0 +1,50 @@
+import time
+
+from src.utils.logger import get_logger
+from src.utils.metrics import Metrics
+
+logger = get_logger("sobes.requests")
+
+
+class TimingMiddleware:
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            self.metrics.observe_error(scope["method"], self._route(scope))
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            route = self._route(scope)
+            self.metrics.observe_request(scope["method"], route, status_code, elapsed)
+
+            if self.metrics.should_log(elapsed):
+                logger.info("request", extra={"fields": {
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status_code,
+                    "duration_ms": round(elapsed * 1000, 3),
+                }})
+
+    @staticmethod
+    def _route(scope) -> str:
+        # the router stores the matched route in the scope; the template keeps label cardinality bounded
+        route = scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
@@ -0,0 +1,34 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter
+from fastapi.params import Depends
+from fastapi.exceptions import HTTPException
+
+from pydantic import UUID4
+
+from src.models.principal import Principal
+from src.app.api.v1.dependencies import get_current_principal, get_services
+from src.config.services import Services
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"]
+)
+
+
+@router.get("")
+async def get_analytics(start_date: date,
+                        end_date: date,
+                        bucket: Literal["day", "week"] = "day",
+                        user: Optional[UUID4] = None,
+                        principal: Principal = Depends(get_current_principal),
+                        services: Services = Depends(get_services)):
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    # regular users only ever see their own numbers
+    if not principal.is_admin:
+        user = principal.user_id
+
+    return await services.db.get_analytics(start_date, end_date, bucket, user)
@@ -4,19 +4,28 @@ from fastapi.exceptions import HTTPException
 
 from typing import Annotated
 from datetime import timedelta
+from pydantic import UUID4
 
 from src.models.token import Token
-from src.models.user import UserGetInfo, UserResponse
+from src.models.user import UserGetInfo, UserResponse, UserRoleUpdate
+from src.models.principal import Principal
+from src.database.errors import UserNotFoundError
 from src.utils.jwt import create_access_token
-from src.config.constants import settings, db
+from src.utils.logger import get_logger
+from src.app.api.v1.dependencies import limit_auth, get_services, require_admin
+from src.config.services import Services
+
+logger = get_logger("sobes.auth")
 
 router = APIRouter(
-    prefix="/users"
+    prefix="/users",
+    dependencies=[Depends(limit_auth)]
 )
 
 @router.post("/login")
-async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> Token:
-    user = await db.auth_user(
+async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+                services: Services = Depends(get_services)) -> Token:
+    user = await services.db.auth_user(
         username=form_data.username,
         password=form_data.password
     )
@@ -28,34 +37,59 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> T
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token_expires = timedelta(minutes=services.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
     # user[0][0] -> user's UUID
     # user[0][2] -> user's role
+    # user[0][4] -> user's token version
 
     access_token = create_access_token(
         payload_data={
             "sub": str(user[0][0]),
             "role": user[0][2],
+            "ver": user[0][4],
+            "epoch": services.revocations.epoch,
         },
-        expires_data=access_token_expires
+        expires_data=access_token_expires,
+        secret=services.settings.SECRET
     )
 
     return Token(access_token=access_token, token_type="bearer")
 
 @router.post("/register")
-async def register(user: UserGetInfo):
+async def register(user: UserGetInfo, services: Services = Depends(get_services)):
     username = user.username
     user_password = user.password
     user_role = user.role
 
-    result = await db.register_new_user(
+    result = await services.db.register_new_user(
         username=username,
         role=user_role,
         password=user_password
     )
-    print(result)
+    logger.info("register", extra={"fields": {"username": username, "created": result}})
     if result:
         return {"status": "success"}
 
     return {"status": "error", "details": "user already exists"}
+
+@router.put("/{user_id}/role")
+async def change_role(user_id: UUID4,
+                      update: UserRoleUpdate,
+                      principal: Principal = Depends(require_admin),
+                      services: Services = Depends(get_services)):
+    # tokens carry the role, so the change bumps the user's token version and cuts off every older token
+    try:
+        token_version = await services.db.change_user_role(user_id, update.role)
+    except UserNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    if token_version is None:
+        return {"status": "unchanged", "role": update.role}
+
+    # this worker applies it right away; the others follow the NOTIFY
+    services.revocations.revoke_user(str(user_id), token_version)
+
+    logger.info("role changed", extra={"fields": {"user_id": str(user_id), "role": update.role.value,
+                                                  "by": str(principal.user_id)}})
+    return {"status": "success", "role": update.role}
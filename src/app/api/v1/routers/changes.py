@@ -0,0 +1,100 @@
+import asyncio
+
+import orjson
+
+from typing import Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status as http_status
+from fastapi.params import Depends
+from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
+
+from pydantic import UUID4
+
+from src.models.principal import Principal
+from src.models.enums.status_enums import Status
+from src.app.api.v1.dependencies import get_current_principal, principal_from_token, limit_by_user, get_services
+from src.database.notifications import ChangeFeed, Subscription
+from src.config.services import Services
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["changes"]
+)
+
+
+def _subscribe(change_feed: ChangeFeed,
+               principal: Principal,
+               user: Optional[UUID4],
+               status: Optional[Status]) -> Subscription:
+    # regular users only receive events about their own tasks
+    user_id = user if principal.is_admin else principal.user_id
+    return change_feed.subscribe(
+        user_id=str(user_id) if user_id is not None else None,
+        status=status.value if status is not None else None
+    )
+
+
+async def _events(subscription: Subscription, keepalive: float):
+    while True:
+        try:
+            event = await asyncio.wait_for(subscription.get(), keepalive)
+        except asyncio.TimeoutError:
+            yield None
+            continue
+
+        dropped = subscription.take_dropped()
+        if dropped:
+            yield {"op": "lagged", "dropped": dropped}
+
+        yield event
+
+
+@router.get("")
+async def stream_changes(user: Optional[UUID4] = None,
+                         status: Optional[Status] = None,
+                         principal: Principal = Depends(get_current_principal),
+                         services: Services = Depends(get_services),
+                         _: None = Depends(limit_by_user)):
+    change_feed = services.change_feed
+    subscription = _subscribe(change_feed, principal, user, status)
+
+    async def sse():
+        try:
+            async for event in _events(subscription, services.settings.CHANGE_FEED_KEEPALIVE):
+                if event is None:
+                    yield b": keepalive\n\n"
+                else:
+                    yield b"data: " + orjson.dumps(event) + b"\n\n"
+        finally:
+            change_feed.unsubscribe(subscription)
+
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.websocket("/ws")
+async def websocket_changes(websocket: WebSocket,
+                            token: str,
+                            user: Optional[UUID4] = None,
+                            status: Optional[Status] = None,
+                            services: Services = Depends(get_services)):
+    try:
+        principal = principal_from_token(token, services)
+    except HTTPException:
+        await websocket.close(code=http_status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    change_feed = services.change_feed
+    subscription = _subscribe(change_feed, principal, user, status)
+
+    try:
+        async for event in _events(subscription, services.settings.CHANGE_FEED_KEEPALIVE):
+            if event is None:
+                event = {"op": "keepalive"}
+            # send blocks while the client is slow; meanwhile the bounded queue drops its oldest events
+            await websocket.send_text(orjson.dumps(event).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        change_feed.unsubscribe(subscription)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from fastapi.params import Depends
+
+from src.app.api.v1.dependencies import get_services, require_admin
+from src.config.services import Services
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"]
+)
+
+
+@router.get("/db")
+async def database_health(services: Services = Depends(get_services)):
+    return {
+        "connections": services.db.connection_stats(),
+        "task_cache": services.db.task_cache.stats(),
+        "change_feed": services.change_feed.stats(),
+        "revocations": services.revocation_sync.stats(),
+        "jobs": services.jobs.stats()
+    }
+
+
+@router.get("/statements", dependencies=[Depends(require_admin)])
+async def statement_health(services: Services = Depends(get_services)):
+    return {
+        "client": services.db.statement_stats(),
+        "server": await services.db.server_statement_stats()
+    }
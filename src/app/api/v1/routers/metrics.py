@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.params import Depends
+from fastapi.responses import PlainTextResponse
+
+from src.app.api.v1.dependencies import get_services
+from src.config.services import Services
+
+router = APIRouter(
+    tags=["metrics"]
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(services: Services = Depends(get_services)):
+    return services.metrics.render()
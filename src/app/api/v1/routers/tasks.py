@@ -1,38 +1,103 @@
-from uuid import uuid4
+import orjson
 
-from fastapi import APIRouter
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Query, Header, Response
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from fastapi.params import Depends
 from fastapi.exceptions import HTTPException
 
 from pydantic import UUID4, Json
 from typing import Optional
 
-from src.models.task import TaskGet
+from src.models.task import TaskGet, TaskPatch, TaskBulkStatusUpdate, TaskResult, TaskListResponse
+from src.models.principal import Principal
+from src.models.enums.status_enums import Status
+
+from src.database.errors import TaskNotFoundError, TaskAccessDeniedError, TaskVersionConflictError
+from src.app.api.v1.dependencies import get_current_principal, require_admin, limit_by_ip, limit_by_user, \
+    get_services
+from src.utils.pagination import InvalidCursorError
+from src.utils.logger import get_logger
+from src.config.services import Services
+
+logger = get_logger("sobes.tasks")
 
-from src.utils.jwt import verify_access_token
-from src.config.constants import db, oauth2_scheme
+NOT_NULL_COLUMNS = ("title", "description", "status", "created_at")
+
+ENRICH_WEATHER_JOB = "enrich_weather"
 
 router = APIRouter(
     prefix="/tasks",
-    tags=["tasks"]
+    tags=["tasks"],
+    dependencies=[Depends(limit_by_ip), Depends(limit_by_user)]
 )
 
 
-@router.post("/create_task")
-async def create_task_api(task: TaskGet, token: str = Depends(oauth2_scheme)):
+def task_json(row) -> dict:
+    # orjson only serializes the stdlib uuid.UUID, not asyncpg's own UUID type
+    task = dict(row)
+    task["id"] = str(task["id"])
+    task["user_id"] = str(task["user_id"])
+    return task
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def version_from_etag(if_match: Optional[str]) -> Optional[int]:
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    tag = if_match.strip().removeprefix("W/").strip('"')
+    if not tag.isdigit():
+        raise HTTPException(status_code=412, detail="Task was modified")
+
+    return int(tag)
+
+
+def register_jobs(services: Services):
+    @services.jobs.handler(ENRICH_WEATHER_JOB)
+    async def enrich_weather(payload: dict):
+        weather = await services.weather.lookup(payload["city"])
+        if weather is not None:
+            await services.db.set_tasks_weather(
+                [UUID(task_id) for task_id in payload["ids"]], payload["city"], weather
+            )
+
+
+def page_size(services: Services, limit: Optional[int]) -> int:
+    # bounds come from the app's own settings, so they are checked per request rather than in the signature
+    if limit is None:
+        return services.settings.TASKS_PAGE_SIZE
+    if limit > services.settings.TASKS_PAGE_SIZE_MAX:
+        raise HTTPException(status_code=422, detail=f"limit must be at most {services.settings.TASKS_PAGE_SIZE_MAX}")
+    return limit
+
+
+async def enqueue_weather(services: Services, task_ids: list, city: str):
+    # the task is already committed; a failed enqueue only costs the forecast, never the request
     try:
-        payload = verify_access_token(token)
-        if not payload:
-            raise HTTPException(status_code=401, detail="Invalid token")
+        await services.jobs.enqueue(ENRICH_WEATHER_JOB, {"ids": task_ids, "city": city})
+    except Exception:
+        logger.exception("enqueue weather failed", extra={"fields": {"city": city}})
 
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
+
+@router.post("/create_task")
+async def create_task_api(task: TaskGet, principal: Principal = Depends(get_current_principal),
+                          services: Services = Depends(get_services)):
+    try:
+        # a cached forecast is attached inline; anything else is fetched after the response
+        pending_weather = False
+        if services.settings.WEATHER_ENABLED and task.city and task.weather is None:
+            task.weather = services.weather.cached(task.city)
+            pending_weather = task.weather is None
 
         task_id = uuid4()
-        result = await db.create_task(
+        result = await services.db.create_task(
             id=task_id,
-            user_id=user_id,
+            user_id=principal.user_id,
             title=task.title,
             description=task.description,
             status=task.status,
@@ -41,130 +106,206 @@ async def create_task_api(task: TaskGet, token: str = Depends(oauth2_scheme)):
             weather=task.weather
         )
 
-        if result:
-            return result
-        else:
+        if not result:
             raise HTTPException(status_code=400, detail="Failed to create task")
 
-    except Exception as err:
-        print(err)
+    except Exception:
+        logger.exception("create_task failed", extra={"fields": {"user_id": principal.user_id}})
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.get("/get_task/{id}")
-async def get_task(id: UUID4, token: str = Depends(oauth2_scheme)):
-    try:
-        payload = verify_access_token(token)
-        if not payload:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    if pending_weather:
+        await enqueue_weather(services, [task_id], task.city)
 
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    return result
 
-        user_role = await db.get_role_by_id(user_id)
-        tasks_owner = await db.get_task_by_id(id)
 
+@router.post("/create_tasks")
+async def create_tasks_api(tasks: list[TaskGet], principal: Principal = Depends(get_current_principal),
+                           services: Services = Depends(get_services)):
+    if not tasks:
+        raise HTTPException(status_code=400, detail="No tasks provided")
 
-        if user_role[0][0] == "user" and str(tasks_owner[0][0]) == user_id:
-            result = await db.get_task_by_id(id)
+    if len(tasks) > services.settings.TASKS_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {services.settings.TASKS_BULK_MAX} tasks per request")
 
-            if result:
-                return {"result": result}
-            else:
-                return {"status": "error"}
-        else:
-            return None
+    # one background job per city that is not cached yet
+    pending_weather: dict[str, list[int]] = {}
+    if services.settings.WEATHER_ENABLED:
+        for index, task in enumerate(tasks):
+            if task.city and task.weather is None:
+                task.weather = services.weather.cached(task.city)
+                if task.weather is None:
+                    pending_weather.setdefault(task.city, []).append(index)
 
-    except Exception as err:
-        raise Exception(err)
+    ids = await services.db.create_tasks(principal.user_id, tasks)
 
-@router.delete("/delete_task/{id}")
-async def delete_task(id: UUID4, token: str = Depends(oauth2_scheme)):
-    try:
-        payload = verify_access_token(token)
-        if not payload:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    for city, indexes in pending_weather.items():
+        await enqueue_weather(services, [ids[index] for index in indexes], city)
 
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    return {"created": len(ids), "ids": ids}
 
-        user_role = await db.get_role_by_id(user_id)
-        tasks_owner = await db.get_task_by_id(id)
+@router.post("/bulk_status")
+async def update_tasks_status(update: TaskBulkStatusUpdate, principal: Principal = Depends(get_current_principal),
+                              services: Services = Depends(get_services)):
+    if len(update.ids) > services.settings.TASKS_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {services.settings.TASKS_BULK_MAX} tasks per request")
 
-        if (user_role[0][0] == "user" and str(tasks_owner[0][0]) == user_id) \
-                or (user_role[0][0] == "admin"):
-            result = await db.delete_task_by_id(id)
+    updated = await services.db.update_tasks_status(update.ids, update.status, principal.user_id, principal.is_admin)
+    return {"updated": len(updated), "ids": updated}
 
-            if result:
-                return {"result": result}
-            else:
-                return {"status": "error"}
-        else:
-            return None
+@router.get("/get_task/{id}", response_model=TaskResult)
+async def get_task(id: UUID4, response: Response, principal: Principal = Depends(get_current_principal),
+                   services: Services = Depends(get_services)):
+    try:
+        result = await services.db.get_task_for_principal(id, principal.user_id, principal.is_admin)
+        response.headers["ETag"] = etag(result["version"])
+        return {"result": result}
 
-    except Exception as err:
-        raise Exception(err)
+    except TaskNotFoundError:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-@router.get("/get_all")
-async def get_tasks(status: Optional[str] = None,
-                    user: Optional[str] = None,
-                    date: Optional[float] = None,
-                    token: str = Depends(oauth2_scheme)):
-    try:
-        payload = verify_access_token(token)
-        if not payload:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    except TaskAccessDeniedError:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
 
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
+@router.delete("/delete_task/{id}")
+async def delete_task(id: UUID4, principal: Principal = Depends(get_current_principal),
+                      services: Services = Depends(get_services)):
+    try:
+        result = await services.db.delete_task_for_principal(id, principal.user_id, principal.is_admin)
+        return {"result": result}
 
-        user_role = await db.get_role_by_id(user_id)
+    except TaskNotFoundError:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-        if user_role[0][0] == "admin":
-            result = await db.sort_tasks(status, user, date)
+    except TaskAccessDeniedError:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
 
-            if result:
-                return {"result": result}
-            else:
-                return {"status": "error"}
-        else:
-            return None
+@router.get("/get_all", response_model=TaskListResponse)
+async def get_tasks(status: Optional[Status] = None,
+                    user: Optional[str] = None,
+                    date: Optional[float] = None,
+                    limit: Optional[int] = Query(None, ge=1),
+                    cursor: Optional[str] = None,
+                    principal: Principal = Depends(require_admin),
+                    services: Services = Depends(get_services)):
+    limit = page_size(services, limit)
 
-    except Exception as err:
-        raise Exception(err)
+    try:
+        result, next_cursor = await services.db.sort_tasks(status.value if status else None, user, date, limit, cursor)
+
+        # rows come from our own schema; skip per-row model validation and let orjson encode them directly
+        return ORJSONResponse({"result": [task_json(row) for row in result], "next_cursor": next_cursor})
+
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/get_all/stream")
+async def stream_tasks(status: Optional[Status] = None,
+                       user: Optional[str] = None,
+                       date: Optional[float] = None,
+                       principal: Principal = Depends(require_admin),
+                       services: Services = Depends(get_services)):
+    async def rows():
+        async for record in services.db.stream_tasks(status.value if status else None, user, date,
+                                                     services.settings.TASKS_STREAM_PREFETCH):
+            yield orjson.dumps(task_json(record)) + b"\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+@router.get("/search", response_model=TaskListResponse)
+async def search_tasks(q: str = Query(..., min_length=1, max_length=200),
+                       status: Optional[Status] = None,
+                       user: Optional[str] = None,
+                       date: Optional[float] = None,
+                       limit: Optional[int] = Query(None, ge=1),
+                       offset: int = Query(0, ge=0),
+                       principal: Principal = Depends(get_current_principal),
+                       services: Services = Depends(get_services)):
+    limit = page_size(services, limit)
+    if offset > services.settings.TASKS_SEARCH_MAX_OFFSET:
+        raise HTTPException(status_code=422,
+                            detail=f"offset must be at most {services.settings.TASKS_SEARCH_MAX_OFFSET}")
+
+    # regular users only search their own tasks
+    if not principal.is_admin:
+        user = str(principal.user_id)
+
+    result = await services.db.search_tasks(q, status.value if status else None, user, date, limit, offset,
+                                            services.settings.TASKS_SEARCH_CANDIDATES)
+
+    next_offset = offset + limit if len(result) == limit else None
+    return ORJSONResponse({
+        "result": [task_json(row) for row in result],
+        "next_cursor": str(next_offset) if next_offset is not None else None
+    })
 
 @router.put("/update/{id}")
 async def update_task(id: UUID4,
                     title: Optional[str] = None,
                     description: Optional[str] = None,
-                    status: Optional[str] = None,
+                    status: Optional[Status] = None,
                     created_at: Optional[float] = None,
                     city: Optional[str] = None,
                     weather: Optional[Json] = None,
-                    token: str = Depends(oauth2_scheme)):
+                    principal: Principal = Depends(require_admin),
+                    services: Services = Depends(get_services)):
+    fields = {
+        "title": title,
+        "description": description,
+        "status": status.value if status else None,
+        "created_at": created_at,
+        "city": city,
+        "weather": weather,
+    }
+    fields = {k: v for k, v in fields.items() if v is not None}
+
+    pending_weather = False
+    if services.settings.WEATHER_ENABLED and city and weather is None:
+        fields["weather"] = services.weather.cached(city)
+        pending_weather = fields["weather"] is None
+
     try:
-        payload = verify_access_token(token)
-        if not payload:
-            raise HTTPException(status_code=401, detail="Invalid token")
+        result = await services.db.update_task_for_principal(id, fields, principal.user_id, principal.is_admin)
 
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
+        if pending_weather:
+            await enqueue_weather(services, [id], city)
+        return {"result": result}
 
-        user_role = await db.get_role_by_id(user_id)
+    except TaskNotFoundError:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-        if user_role[0][0] == "admin":
-            result = await db.update_task_by_id(
-                id, title, description, status, created_at, city, weather
-            )
-            if result:
-                return {"result": result}
-            else:
-                return {"status": "error"}
-        else:
-            return None
-
-    except Exception as err:
-        raise Exception(err)
\ No newline at end of file
+@router.patch("/update/{id}", response_model=TaskResult)
+async def patch_task(id: UUID4,
+                     patch: TaskPatch,
+                     if_match: Optional[str] = Header(None),
+                     principal: Principal = Depends(get_current_principal),
+                     services: Services = Depends(get_services)):
+    fields = patch.model_dump(mode="json", exclude_unset=True, exclude={"version"})
+
+    if any(fields.get(column, "") is None for column in NOT_NULL_COLUMNS):
+        raise HTTPException(status_code=422, detail=f"{', '.join(NOT_NULL_COLUMNS)} cannot be null")
+
+    version = patch.version if patch.version is not None else version_from_etag(if_match)
+
+    pending_weather = False
+    if services.settings.WEATHER_ENABLED and fields.get("city") and "weather" not in fields:
+        fields["weather"] = services.weather.cached(fields["city"])
+        pending_weather = fields["weather"] is None
+
+    try:
+        result = await services.db.update_task_for_principal(id, fields, principal.user_id, principal.is_admin, version)
+
+    except TaskNotFoundError:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    except TaskAccessDeniedError:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    except TaskVersionConflictError as err:
+        raise HTTPException(status_code=412, detail="Task was modified", headers={"ETag": etag(err.version)})
+
+    if pending_weather:
+        await enqueue_weather(services, [id], fields["city"])
+
+    # the row comes back from UPDATE ... RETURNING, so the client never has to re-fetch it
+    return ORJSONResponse({"result": task_json(result)}, headers={"ETag": etag(result["version"])})
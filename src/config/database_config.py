@@ -31,10 +31,621 @@ CREATE TABLE IF NOT EXISTS tasks(
 )
 """
 
+QUERY_CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations(
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+QUERY_LOCK_MIGRATIONS = "SELECT pg_advisory_xact_lock(hashtext('schema_migrations'))"
+QUERY_GET_SCHEMA_VERSION = "SELECT COALESCE(MAX(version), 0) FROM schema_migrations"
+QUERY_MIGRATIONS_TABLE_EXISTS = "SELECT to_regclass('schema_migrations') IS NOT NULL"
+QUERY_RECORD_MIGRATION = "INSERT INTO schema_migrations(version, name) VALUES($1, $2)"
+
+QUERY_ADD_KEYS_AND_INDEXES = """
+ALTER TABLE users ADD PRIMARY KEY (id);
+ALTER TABLE tasks ADD PRIMARY KEY (id);
+
+CREATE INDEX IF NOT EXISTS tasks_user_status_created_at_idx ON tasks (user_id, status, created_at);
+CREATE INDEX IF NOT EXISTS tasks_status_created_at_idx ON tasks (status, created_at DESC);
+CREATE INDEX IF NOT EXISTS tasks_created_at_id_idx ON tasks (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS tasks_weather_idx ON tasks USING GIN (weather jsonb_path_ops);
+"""
+
+QUERY_CREATE_TASK_ANALYTICS = """
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS status_changed_at TIMESTAMP;
+
+CREATE TABLE IF NOT EXISTS task_daily_rollup(
+    day DATE NOT NULL,
+    user_id UUID NOT NULL,
+    status task_status NOT NULL,
+    city TEXT NOT NULL DEFAULT '',
+    task_count BIGINT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (day, user_id, status, city)
+);
+
+CREATE TABLE IF NOT EXISTS task_status_time(
+    user_id UUID NOT NULL,
+    status task_status NOT NULL,
+    total_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+    transitions BIGINT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (user_id, status)
+);
+
+CREATE OR REPLACE FUNCTION task_rollup_add(p_day DATE, p_user UUID, p_status task_status, p_city TEXT, p_delta INTEGER)
+RETURNS void AS $$
+BEGIN
+    IF p_day IS NULL OR p_status IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO task_daily_rollup(day, user_id, status, city, task_count)
+    VALUES (p_day, p_user, p_status, COALESCE(p_city, ''), p_delta)
+    ON CONFLICT (day, user_id, status, city)
+    DO UPDATE SET task_count = task_daily_rollup.task_count + EXCLUDED.task_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION tasks_track_status_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        NEW.status_changed_at := COALESCE(NEW.status_changed_at, NEW.created_at, now());
+    ELSIF NEW.status IS DISTINCT FROM OLD.status THEN
+        IF OLD.status IS NOT NULL THEN
+            INSERT INTO task_status_time(user_id, status, total_seconds, transitions)
+            VALUES (
+                OLD.user_id,
+                OLD.status,
+                GREATEST(EXTRACT(EPOCH FROM now() - COALESCE(OLD.status_changed_at, OLD.created_at, now())), 0),
+                1
+            )
+            ON CONFLICT (user_id, status)
+            DO UPDATE SET total_seconds = task_status_time.total_seconds + EXCLUDED.total_seconds,
+                          transitions = task_status_time.transitions + 1;
+        END IF;
+
+        NEW.status_changed_at := now();
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION tasks_maintain_rollup() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM task_rollup_add(OLD.created_at::date, OLD.user_id, OLD.status, OLD.city, -1);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM task_rollup_add(NEW.created_at::date, NEW.user_id, NEW.status, NEW.city, 1);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tasks_status_change ON tasks;
+CREATE TRIGGER tasks_status_change
+    BEFORE INSERT OR UPDATE OF status ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_track_status_change();
+
+DROP TRIGGER IF EXISTS tasks_rollup ON tasks;
+CREATE TRIGGER tasks_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF created_at, user_id, status, city ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_maintain_rollup();
+
+UPDATE tasks SET status_changed_at = created_at WHERE status_changed_at IS NULL;
+
+DELETE FROM task_daily_rollup;
+INSERT INTO task_daily_rollup(day, user_id, status, city, task_count)
+SELECT created_at::date, user_id, status, COALESCE(city, ''), COUNT(*)
+FROM tasks
+WHERE created_at IS NOT NULL AND status IS NOT NULL
+GROUP BY 1, 2, 3, 4;
+"""
+
+TASK_CHANGES_CHANNEL = "task_changes"
+QUERY_CREATE_TASK_NOTIFICATIONS = """
+CREATE OR REPLACE FUNCTION tasks_notify_change() RETURNS trigger AS $$
+DECLARE
+    row_data tasks%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := OLD;
+    ELSE
+        row_data := NEW;
+    END IF;
+
+    -- keep the payload small (NOTIFY caps it at 8000 bytes); clients fetch the row if they need it
+    PERFORM pg_notify('task_changes', json_build_object(
+        'op', lower(TG_OP),
+        'id', row_data.id,
+        'user_id', row_data.user_id,
+        'status', row_data.status
+    )::text);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tasks_notify ON tasks;
+CREATE TRIGGER tasks_notify
+    AFTER INSERT OR UPDATE OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_notify_change();
+"""
+
+QUERY_CREATE_TASK_SEARCH = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS tasks_search_vector_idx ON tasks USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS tasks_title_trgm_idx ON tasks USING GIN (title gin_trgm_ops);
+"""
+
+QUERY_PARTITION_TASKS = """
+CREATE TABLE tasks_partitioned(
+    id UUID NOT NULL,
+    user_id UUID NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    status task_status,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    city TEXT,
+    weather jsonb,
+    status_changed_at TIMESTAMP,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED,
+
+    CONSTRAINT tasks_pkey_new PRIMARY KEY (id, created_at),
+    CONSTRAINT tasks_user_id_fkey_new FOREIGN KEY (user_id) REFERENCES users (id)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE tasks_default PARTITION OF tasks_partitioned DEFAULT;
+
+-- monthly partitions covering the existing rows plus the next few months
+DO $$
+DECLARE
+    v_month DATE;
+    v_last DATE := (date_trunc('month', now()) + interval '3 months')::date;
+BEGIN
+    SELECT COALESCE(date_trunc('month', MIN(created_at)), date_trunc('month', now()))::date INTO v_month FROM tasks;
+
+    WHILE v_month <= v_last LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF tasks_partitioned FOR VALUES FROM (%L) TO (%L)',
+            'tasks_p' || to_char(v_month, 'YYYYMM'), v_month, (v_month + interval '1 month')::date
+        );
+        v_month := (v_month + interval '1 month')::date;
+    END LOOP;
+END$$;
+
+INSERT INTO tasks_partitioned(id, user_id, title, description, status, created_at, city, weather, status_changed_at)
+SELECT id, user_id, title, description, status, COALESCE(created_at, now()), city, weather, status_changed_at
+FROM tasks;
+
+DROP TABLE tasks;
+ALTER TABLE tasks_partitioned RENAME TO tasks;
+ALTER TABLE tasks RENAME CONSTRAINT tasks_pkey_new TO tasks_pkey;
+ALTER TABLE tasks RENAME CONSTRAINT tasks_user_id_fkey_new TO tasks_user_id_fkey;
+
+CREATE INDEX tasks_user_status_created_at_idx ON tasks (user_id, status, created_at);
+CREATE INDEX tasks_status_created_at_idx ON tasks (status, created_at DESC);
+CREATE INDEX tasks_created_at_id_idx ON tasks (created_at DESC, id DESC);
+CREATE INDEX tasks_weather_idx ON tasks USING GIN (weather jsonb_path_ops);
+CREATE INDEX tasks_search_vector_idx ON tasks USING GIN (search_vector);
+CREATE INDEX tasks_title_trgm_idx ON tasks USING GIN (title gin_trgm_ops);
+
+CREATE TABLE IF NOT EXISTS tasks_archive(
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    status task_status,
+    created_at TIMESTAMP NOT NULL,
+    city TEXT,
+    weather jsonb,
+    archived_at TIMESTAMP NOT NULL DEFAULT now()
+) WITH (fillfactor = 100);
+
+-- partition moves and archival set sobes.maintenance so the row triggers leave rollups and listeners alone
+CREATE OR REPLACE FUNCTION tasks_in_maintenance() RETURNS boolean AS $$
+    SELECT COALESCE(current_setting('sobes.maintenance', true), '') = 'on';
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION tasks_maintain_rollup() RETURNS trigger AS $$
+BEGIN
+    IF tasks_in_maintenance() THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM task_rollup_add(OLD.created_at::date, OLD.user_id, OLD.status, OLD.city, -1);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM task_rollup_add(NEW.created_at::date, NEW.user_id, NEW.status, NEW.city, 1);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION tasks_notify_change() RETURNS trigger AS $$
+DECLARE
+    row_data tasks%ROWTYPE;
+BEGIN
+    IF tasks_in_maintenance() THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        row_data := OLD;
+    ELSE
+        row_data := NEW;
+    END IF;
+
+    PERFORM pg_notify('task_changes', json_build_object(
+        'op', lower(TG_OP),
+        'id', row_data.id,
+        'user_id', row_data.user_id,
+        'status', row_data.status
+    )::text);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tasks_status_change
+    BEFORE INSERT OR UPDATE OF status ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_track_status_change();
+
+CREATE TRIGGER tasks_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF created_at, user_id, status, city ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_maintain_rollup();
+
+CREATE TRIGGER tasks_notify
+    AFTER INSERT OR UPDATE OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_notify_change();
+
+CREATE OR REPLACE FUNCTION create_task_partition(p_month DATE) RETURNS boolean AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::date;
+    v_end DATE := (date_trunc('month', p_month) + interval '1 month')::date;
+    v_name TEXT := 'tasks_p' || to_char(date_trunc('month', p_month), 'YYYYMM');
+    v_parked BOOLEAN;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_task_partition'));
+
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+
+    PERFORM set_config('sobes.maintenance', 'on', true);
+
+    -- rows already sitting in the default partition would block the new range: park them and move them over
+    SELECT EXISTS (SELECT 1 FROM tasks_default WHERE created_at >= v_start AND created_at < v_end) INTO v_parked;
+
+    IF v_parked THEN
+        CREATE TEMP TABLE tasks_parked ON COMMIT DROP AS
+        SELECT id, user_id, title, description, status, created_at, city, weather, status_changed_at
+        FROM tasks_default WHERE false;
+
+        WITH parked AS (
+            DELETE FROM tasks_default WHERE created_at >= v_start AND created_at < v_end
+            RETURNING id, user_id, title, description, status, created_at, city, weather, status_changed_at
+        )
+        INSERT INTO tasks_parked SELECT * FROM parked;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I PARTITION OF tasks FOR VALUES FROM (%L) TO (%L)', v_name, v_start, v_end);
+
+    IF v_parked THEN
+        INSERT INTO tasks(id, user_id, title, description, status, created_at, city, weather, status_changed_at)
+        SELECT * FROM tasks_parked;
+        DROP TABLE tasks_parked;
+    END IF;
+
+    PERFORM set_config('sobes.maintenance', 'off', true);
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ensure_task_partitions(p_months_ahead INTEGER) RETURNS INTEGER AS $$
+DECLARE
+    v_created INTEGER := 0;
+BEGIN
+    FOR i IN 0..p_months_ahead LOOP
+        IF create_task_partition((date_trunc('month', now()) + make_interval(months => i))::date) THEN
+            v_created := v_created + 1;
+        END IF;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION archive_done_tasks(p_older_than INTERVAL, p_limit INTEGER) RETURNS INTEGER AS $$
+DECLARE
+    v_moved INTEGER;
+BEGIN
+    PERFORM set_config('sobes.maintenance', 'on', true);
+
+    WITH moved AS (
+        DELETE FROM tasks
+        WHERE (id, created_at) IN (
+            SELECT id, created_at FROM tasks
+            WHERE status = 'done' AND created_at < now() - p_older_than
+            LIMIT p_limit
+        )
+        RETURNING id, user_id, title, description, status, created_at, city, weather
+    )
+    INSERT INTO tasks_archive(id, user_id, title, description, status, created_at, city, weather)
+    SELECT * FROM moved
+    ON CONFLICT (id) DO NOTHING;
+
+    GET DIAGNOSTICS v_moved = ROW_COUNT;
+
+    PERFORM set_config('sobes.maintenance', 'off', true);
+    RETURN v_moved;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION drop_empty_task_partitions(p_before DATE) RETURNS INTEGER AS $$
+DECLARE
+    v_partition RECORD;
+    v_dropped INTEGER := 0;
+    v_has_rows BOOLEAN;
+BEGIN
+    FOR v_partition IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'tasks' AND child.relname ~ '^tasks_p[0-9]{6}$'
+    LOOP
+        CONTINUE WHEN (to_date(substr(v_partition.relname, 8), 'YYYYMM') + interval '1 month')::date > p_before;
+
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I)', v_partition.relname) INTO v_has_rows;
+        CONTINUE WHEN v_has_rows;
+
+        EXECUTE format('DROP TABLE %I', v_partition.relname);
+        v_dropped := v_dropped + 1;
+    END LOOP;
+
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+QUERY_ADD_TASK_VERSIONS = """
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+-- every write bumps the version, including bulk status changes, so an ETag never outlives the row it describes
+CREATE OR REPLACE FUNCTION tasks_bump_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tasks_version ON tasks;
+CREATE TRIGGER tasks_version
+    BEFORE UPDATE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_bump_version();
+
+-- parked rows keep their version when they move into a new partition
+CREATE OR REPLACE FUNCTION create_task_partition(p_month DATE) RETURNS boolean AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::date;
+    v_end DATE := (date_trunc('month', p_month) + interval '1 month')::date;
+    v_name TEXT := 'tasks_p' || to_char(date_trunc('month', p_month), 'YYYYMM');
+    v_parked BOOLEAN;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_task_partition'));
+
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+
+    PERFORM set_config('sobes.maintenance', 'on', true);
+
+    SELECT EXISTS (SELECT 1 FROM tasks_default WHERE created_at >= v_start AND created_at < v_end) INTO v_parked;
+
+    IF v_parked THEN
+        CREATE TEMP TABLE tasks_parked ON COMMIT DROP AS
+        SELECT id, user_id, title, description, status, created_at, city, weather, status_changed_at, version
+        FROM tasks_default WHERE false;
+
+        WITH parked AS (
+            DELETE FROM tasks_default WHERE created_at >= v_start AND created_at < v_end
+            RETURNING id, user_id, title, description, status, created_at, city, weather, status_changed_at, version
+        )
+        INSERT INTO tasks_parked SELECT * FROM parked;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I PARTITION OF tasks FOR VALUES FROM (%L) TO (%L)', v_name, v_start, v_end);
+
+    IF v_parked THEN
+        INSERT INTO tasks(id, user_id, title, description, status, created_at, city, weather, status_changed_at, version)
+        SELECT * FROM tasks_parked;
+        DROP TABLE tasks_parked;
+    END IF;
+
+    PERFORM set_config('sobes.maintenance', 'off', true);
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+QUERY_CREATE_JOBS = """
+CREATE TABLE IF NOT EXISTS jobs(
+    id BIGSERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    payload jsonb NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_at TIMESTAMP NOT NULL DEFAULT now(),
+    locked_until TIMESTAMP,
+    failed_at TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS jobs_ready_idx ON jobs (run_at) WHERE failed_at IS NULL;
+"""
+
+TOKEN_REVOCATIONS_CHANNEL = "token_revocations"
+QUERY_CREATE_TOKEN_REVOCATIONS = """
+CREATE TABLE IF NOT EXISTS token_revocations(
+    user_id UUID PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+    revoked_before BIGINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION token_revocations_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('token_revocations', json_build_object(
+        'user_id', NEW.user_id,
+        'revoked_before', NEW.revoked_before
+    )::text);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS token_revocations_notify ON token_revocations;
+CREATE TRIGGER token_revocations_notify
+    AFTER INSERT OR UPDATE ON token_revocations
+    FOR EACH ROW EXECUTE FUNCTION token_revocations_notify();
+"""
+
+# a per-user counter embedded in every token; the timestamps above could not tell a token issued
+# in the same second as a role change apart from one issued right after it
+QUERY_ADD_USER_TOKEN_VERSIONS = """
+DROP TABLE IF EXISTS token_revocations;
+DROP FUNCTION IF EXISTS token_revocations_notify();
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION users_notify_token_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('token_revocations', json_build_object(
+        'user_id', NEW.id,
+        'token_version', NEW.token_version
+    )::text);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS users_token_version_notify ON users;
+CREATE TRIGGER users_token_version_notify
+    AFTER UPDATE OF token_version ON users
+    FOR EACH ROW WHEN (NEW.token_version IS DISTINCT FROM OLD.token_version)
+    EXECUTE FUNCTION users_notify_token_version();
+"""
+
+# a task is archived once it has been done for the whole period, not merely created that long ago; the
+# moves still skip the row triggers, so every archived row is announced as a delete for the task caches
+QUERY_ARCHIVE_BY_STATUS_CHANGE = """
+CREATE OR REPLACE FUNCTION archive_done_tasks(p_older_than INTERVAL, p_limit INTEGER) RETURNS INTEGER AS $$
+DECLARE
+    v_events TEXT[];
+    v_event TEXT;
+BEGIN
+    PERFORM set_config('sobes.maintenance', 'on', true);
+
+    WITH moved AS (
+        DELETE FROM tasks
+        WHERE (id, created_at) IN (
+            SELECT id, created_at FROM tasks
+            WHERE status = 'done'
+              AND created_at < now() - p_older_than
+              AND COALESCE(status_changed_at, created_at) < now() - p_older_than
+            LIMIT p_limit
+        )
+        RETURNING id, user_id, title, description, status, created_at, city, weather
+    ), archived AS (
+        INSERT INTO tasks_archive(id, user_id, title, description, status, created_at, city, weather)
+        SELECT * FROM moved
+        ON CONFLICT (id) DO NOTHING
+    )
+    SELECT COALESCE(array_agg(json_build_object(
+        'op', 'delete',
+        'id', id,
+        'user_id', user_id,
+        'status', status
+    )::text), '{}')
+    FROM moved INTO v_events;
+
+    PERFORM set_config('sobes.maintenance', 'off', true);
+
+    FOREACH v_event IN ARRAY v_events LOOP
+        PERFORM pg_notify('task_changes', v_event);
+    END LOOP;
+
+    RETURN cardinality(v_events);
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# time in status is recorded on the day the task leaves the status, so analytics can filter it by period
+# like the other rollups; totals gathered before this migration have no day and count as of its date
+QUERY_ADD_STATUS_TIME_DAYS = """
+ALTER TABLE task_status_time ADD COLUMN IF NOT EXISTS day DATE;
+UPDATE task_status_time SET day = CURRENT_DATE WHERE day IS NULL;
+ALTER TABLE task_status_time ALTER COLUMN day SET NOT NULL;
+
+ALTER TABLE task_status_time DROP CONSTRAINT IF EXISTS task_status_time_pkey;
+ALTER TABLE task_status_time ADD PRIMARY KEY (day, user_id, status);
+
+CREATE OR REPLACE FUNCTION tasks_track_status_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        NEW.status_changed_at := COALESCE(NEW.status_changed_at, NEW.created_at, now());
+    ELSIF NEW.status IS DISTINCT FROM OLD.status THEN
+        IF OLD.status IS NOT NULL THEN
+            INSERT INTO task_status_time(day, user_id, status, total_seconds, transitions)
+            VALUES (
+                now()::date,
+                OLD.user_id,
+                OLD.status,
+                GREATEST(EXTRACT(EPOCH FROM now() - COALESCE(OLD.status_changed_at, OLD.created_at, now())), 0),
+                1
+            )
+            ON CONFLICT (day, user_id, status)
+            DO UPDATE SET total_seconds = task_status_time.total_seconds + EXCLUDED.total_seconds,
+                          transitions = task_status_time.transitions + 1;
+        END IF;
+
+        NEW.status_changed_at := now();
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
 QUERY_REGISTER_NEW_USER = """INSERT INTO users(id, username, role, password_hash) VALUES($1, $2, $3, $4)"""
-QUERY_AUTH_USER = "SELECT * FROM users WHERE username = $1 AND password_hash = $2"
+QUERY_AUTH_USER = "SELECT * FROM users WHERE username = $1"
+QUERY_UPDATE_PASSWORD_HASH = "UPDATE users SET password_hash = $2 WHERE id = $1"
 QUERY_GET_USER_BY_USERNAME = "SELECT id FROM users WHERE username = $1"
 QUERY_GET_ROLE_BY_ID = "SELECT role FROM users WHERE id = $1"
+QUERY_CHANGE_USER_ROLE = """
+    UPDATE users SET role = $2, token_version = token_version + 1
+    WHERE id = $1 AND role IS DISTINCT FROM $2::user_role
+    RETURNING token_version
+"""
+QUERY_GET_TOKEN_VERSIONS = "SELECT id, token_version FROM users WHERE token_version > 0"
 
 
 QUERY_GET_TASK_BY_ID = "SELECT user_id, title, description, status, created_at, city, weather FROM tasks WHERE id = $1"
@@ -43,6 +654,104 @@ QUERY_CREATE_TASK = """
     INSERT INTO tasks(id, user_id, title, description, status, created_at, city, weather) 
     VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
 """
+TASKS_COPY_COLUMNS = ["id", "user_id", "title", "description", "status", "created_at", "city", "weather"]
+QUERY_BULK_UPDATE_TASK_STATUS = """
+    UPDATE tasks SET status = $1
+    WHERE id = ANY($2::uuid[]) AND (user_id = $3 OR $4::boolean)
+    RETURNING id
+"""
 QUERY_DELETE_TASK_BY_ID = "DELETE FROM tasks WHERE id = $1"
-QUERY_UPDATE_TASK_BY_ID = "UPDATE tasks SET"
-QUERY_GET_TASK_WITH_FILTER = "SELECT * FROM tasks WHERE"
\ No newline at end of file
+QUERY_GET_TASK = "SELECT id, user_id, title, description, status, created_at, city, weather, version FROM tasks WHERE id = $1"
+QUERY_DELETE_TASK_FOR_PRINCIPAL = """
+    WITH target AS (
+        SELECT id, user_id FROM tasks WHERE id = $1
+    ), deleted AS (
+        DELETE FROM tasks USING target
+        WHERE tasks.id = target.id AND (target.user_id = $2 OR $3::boolean)
+        RETURNING tasks.id
+    )
+    SELECT EXISTS (SELECT 1 FROM target) AS found, EXISTS (SELECT 1 FROM deleted) AS deleted
+"""
+QUERY_GET_TASK_VERSION = "SELECT user_id, version FROM tasks WHERE id = $1"
+QUERY_SET_TASKS_WEATHER = """
+    UPDATE tasks SET weather = $3
+    WHERE id = ANY($1::uuid[]) AND city = $2 AND weather IS NULL
+    RETURNING id
+"""
+QUERY_STATEMENT_PLAN_STATS = """
+    SELECT query, calls, total_plan_time, total_exec_time, mean_plan_time, mean_exec_time, rows
+    FROM pg_stat_statements
+    ORDER BY total_exec_time DESC
+    LIMIT $1
+"""
+
+QUERY_ANALYTICS_BY_STATUS = """
+    SELECT status, SUM(task_count)::bigint AS total
+    FROM task_daily_rollup
+    WHERE day BETWEEN $1 AND $2 AND ($3::uuid IS NULL OR user_id = $3)
+    GROUP BY status
+"""
+QUERY_ANALYTICS_HISTOGRAM = """
+    SELECT date_trunc($4, day)::date AS bucket,
+           SUM(task_count)::bigint AS total,
+           (SUM(task_count) FILTER (WHERE status = 'todo'))::bigint AS todo,
+           (SUM(task_count) FILTER (WHERE status = 'in_progress'))::bigint AS in_progress,
+           (SUM(task_count) FILTER (WHERE status = 'done'))::bigint AS done
+    FROM task_daily_rollup
+    WHERE day BETWEEN $1 AND $2 AND ($3::uuid IS NULL OR user_id = $3)
+    GROUP BY bucket
+    ORDER BY bucket
+"""
+QUERY_ANALYTICS_BY_CITY = """
+    SELECT NULLIF(city, '') AS city,
+           SUM(task_count)::bigint AS total,
+           COALESCE(SUM(task_count) FILTER (WHERE status = 'done'), 0)::bigint AS done
+    FROM task_daily_rollup
+    WHERE day BETWEEN $1 AND $2 AND ($3::uuid IS NULL OR user_id = $3)
+    GROUP BY city
+    HAVING SUM(task_count) > 0
+    ORDER BY total DESC
+    LIMIT $4
+"""
+QUERY_ANALYTICS_TIME_IN_STATUS = """
+    SELECT status, SUM(total_seconds) / NULLIF(SUM(transitions), 0) AS mean_seconds, SUM(transitions)::bigint AS transitions
+    FROM task_status_time
+    WHERE day BETWEEN $1 AND $2 AND ($3::uuid IS NULL OR user_id = $3)
+    GROUP BY status
+"""
+
+QUERY_REPLICA_LAG = """
+    SELECT CASE WHEN pg_is_in_recovery()
+                THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                ELSE 0
+           END
+"""
+
+QUERY_TRY_LOCK_MAINTENANCE = "SELECT pg_try_advisory_lock(hashtext('tasks_maintenance'))"
+QUERY_UNLOCK_MAINTENANCE = "SELECT pg_advisory_unlock(hashtext('tasks_maintenance'))"
+QUERY_ENSURE_TASK_PARTITIONS = "SELECT ensure_task_partitions($1)"
+QUERY_ARCHIVE_DONE_TASKS = "SELECT archive_done_tasks(make_interval(days => $1), $2)"
+QUERY_DROP_EMPTY_TASK_PARTITIONS = "SELECT drop_empty_task_partitions($1)"
+QUERY_PURGE_TASK_ARCHIVE = "DELETE FROM tasks_archive WHERE created_at < now() - make_interval(days => $1)"
+
+QUERY_INSERT_JOB = """
+    INSERT INTO jobs(name, payload, attempts, run_at, failed_at, last_error)
+    VALUES ($1, $2, $3, now() + make_interval(secs => $4), CASE WHEN $5::boolean THEN now() END, $6)
+"""
+QUERY_CLAIM_JOBS = """
+    UPDATE jobs SET locked_until = now() + make_interval(secs => $2)
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE failed_at IS NULL AND run_at <= now() AND (locked_until IS NULL OR locked_until < now())
+        ORDER BY run_at
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, name, payload, attempts
+"""
+QUERY_RETRY_JOB = """
+    UPDATE jobs SET attempts = $2, run_at = now() + make_interval(secs => $3), locked_until = NULL,
+                    failed_at = CASE WHEN $4::boolean THEN now() END, last_error = $5
+    WHERE id = $1
+"""
+QUERY_DELETE_JOB = "DELETE FROM jobs WHERE id = $1"
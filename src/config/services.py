@@ -0,0 +1,156 @@
+import asyncio
+
+from src.settings import Settings
+from src.database.crud import Database
+from src.database.pool import ConnectionPool
+from src.database.replicas import ReplicaRouter
+from src.database.notifications import ChangeFeed
+from src.database.revocations import RevocationSync
+from src.database.partitions import PartitionMaintainer
+from src.database.jobs import JobQueue
+from src.database.migrations import upgrade
+from src.database.task_cache import TaskCache, LocalInvalidation, NotifyInvalidation
+from src.config.database_config import TASK_CHANGES_CHANNEL
+from src.database.leaks import ConnectionTracker
+from src.utils.cache import AsyncTTLCache
+from src.utils.revocation import TokenRevocations
+from src.utils.hashing import PasswordHasher
+from src.utils.metrics import Metrics
+from src.utils.weather import WeatherService, StubWeatherProvider, OpenWeatherProvider
+from src.utils.rate_limit import RateLimit, InMemoryTokenBucket, RedisTokenBucket
+
+
+class Services:
+    # building is cheap and does no I/O; connections are only opened in start()
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+        self.revocations = TokenRevocations(epoch=settings.TOKEN_EPOCH)
+        self.metrics = Metrics(
+            log_sample_rate=settings.METRICS_LOG_SAMPLE_RATE,
+            slow_request_seconds=settings.METRICS_SLOW_REQUEST_SECONDS
+        )
+
+        self.pool = self.make_pool(settings.DATABASE_URI)
+
+        self.replicas = ReplicaRouter(
+            primary=self.pool,
+            replicas=[self.make_pool(uri) for uri in settings.replica_uris],
+            check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+            max_lag=settings.DB_REPLICA_MAX_LAG
+        )
+
+        self.hasher = PasswordHasher(
+            rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+            workers=settings.PASSWORD_HASH_WORKERS
+        )
+
+        self.change_feed = ChangeFeed(
+            dsn=settings.DATABASE_URI,
+            channel=TASK_CHANGES_CHANNEL,
+            queue_size=settings.CHANGE_FEED_QUEUE_SIZE
+        )
+
+        if settings.TASK_CACHE_INVALIDATION == "notify":
+            task_cache_invalidation = NotifyInvalidation(self.change_feed)
+        else:
+            task_cache_invalidation = LocalInvalidation()
+
+        self.task_cache = TaskCache(
+            maxsize=settings.TASK_CACHE_MAXSIZE,
+            ttl=settings.TASK_CACHE_TTL,
+            invalidation=task_cache_invalidation
+        )
+
+        self.db = Database(
+            database_uri=settings.DATABASE_URI,
+            pool=self.pool,
+            hasher=self.hasher,
+            replicas=self.replicas,
+            task_cache=self.task_cache
+        )
+
+        self.revocation_sync = RevocationSync(
+            db=self.db,
+            feed=self.change_feed,
+            revocations=self.revocations
+        )
+
+        self.jobs = JobQueue(
+            pool=self.pool,
+            concurrency=settings.JOBS_CONCURRENCY,
+            queue_size=settings.JOBS_QUEUE_SIZE,
+            max_attempts=settings.JOBS_MAX_ATTEMPTS,
+            retry_delay=settings.JOBS_RETRY_DELAY,
+            poll_interval=settings.JOBS_POLL_INTERVAL,
+            poll_batch=settings.JOBS_POLL_BATCH,
+            lease=settings.JOBS_LEASE_SECONDS
+        )
+
+        self.partitions = PartitionMaintainer(
+            pool=self.pool,
+            months_ahead=settings.TASKS_PARTITION_MONTHS_AHEAD,
+            archive_after_days=settings.TASKS_ARCHIVE_AFTER_DAYS,
+            archive_batch=settings.TASKS_ARCHIVE_BATCH,
+            archive_retention_days=settings.TASKS_ARCHIVE_RETENTION_DAYS,
+            interval=settings.TASKS_MAINTENANCE_INTERVAL
+        )
+
+        if settings.WEATHER_PROVIDER == "stub":
+            weather_provider = StubWeatherProvider()
+        else:
+            # settings refuse enabled enrichment without a key; a disabled provider is never called
+            weather_provider = OpenWeatherProvider(api_key=settings.OPENWEATHER_API_KEY)
+
+        self.weather = WeatherService(
+            provider=weather_provider,
+            cache=AsyncTTLCache(maxsize=settings.WEATHER_CACHE_MAXSIZE, ttl=settings.WEATHER_CACHE_TTL)
+        )
+
+        if settings.RATE_LIMIT_BACKEND == "redis" and settings.REDIS_URL:
+            self.rate_limit_backend = RedisTokenBucket(url=settings.REDIS_URL)
+        else:
+            self.rate_limit_backend = InMemoryTokenBucket()
+
+        self.auth_rate_limit = RateLimit(
+            self.rate_limit_backend, "auth", settings.RATE_LIMIT_AUTH_PER_MINUTE, settings.RATE_LIMIT_AUTH_BURST
+        )
+        self.ip_rate_limit = RateLimit(
+            self.rate_limit_backend, "ip", settings.RATE_LIMIT_IP_PER_MINUTE, settings.RATE_LIMIT_IP_BURST
+        )
+        self.user_rate_limit = RateLimit(
+            self.rate_limit_backend, "user", settings.RATE_LIMIT_USER_PER_MINUTE, settings.RATE_LIMIT_USER_BURST
+        )
+
+    def make_pool(self, dsn: str) -> ConnectionPool:
+        return ConnectionPool(
+            dsn=dsn,
+            min_size=self.settings.db_pool_min_size,
+            max_size=self.settings.db_pool_max_size,
+            max_inactive_connection_lifetime=self.settings.DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME,
+            statement_cache_size=self.settings.DB_STATEMENT_CACHE_SIZE,
+            tracker=ConnectionTracker(leak_threshold=self.settings.DB_LEAK_THRESHOLD),
+            observer=self.metrics
+        )
+
+    async def migrate(self) -> list[int]:
+        # a pooled connection instead of a fresh one; upgrade() returns early when the schema is current
+        async with self.pool.acquire() as connection:
+            return await upgrade(connection)
+
+    async def start(self):
+        # the LISTEN connection does not depend on the schema, so it connects while the pool fills
+        await asyncio.gather(self.db.open(), self.change_feed.start())
+        await self.migrate()
+        await self.revocation_sync.start()
+        await self.partitions.start()
+        await self.jobs.start()
+
+    async def stop(self):
+        await self.jobs.stop()
+        await self.partitions.stop()
+        await self.change_feed.stop()
+        await self.revocation_sync.stop()
+        await self.db.shutdown()
+        await self.weather.close()
+        await self.rate_limit_backend.close()
@@ -0,0 +1,16 @@
+class UserNotFoundError(Exception):
+    pass
+
+
+class TaskNotFoundError(Exception):
+    pass
+
+
+class TaskAccessDeniedError(Exception):
+    pass
+
+
+class TaskVersionConflictError(Exception):
+    def __init__(self, task_id, version: int):
+        super().__init__(task_id)
+        self.version = version
@@ -0,0 +1,196 @@
+import asyncio
+
+import orjson
+
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from src.database.pool import ConnectionPool
+from src.config.database_config import QUERY_INSERT_JOB, QUERY_CLAIM_JOBS, QUERY_RETRY_JOB, QUERY_DELETE_JOB
+from src.utils.logger import get_logger
+
+logger = get_logger("sobes.jobs")
+
+
+class Job(NamedTuple):
+    name: str
+    payload: Any
+    attempts: int = 0
+    id: Optional[int] = None
+
+
+class JobQueue:
+    def __init__(self,
+                 pool: ConnectionPool,
+                 concurrency: int = 4,
+                 queue_size: int = 1000,
+                 max_attempts: int = 5,
+                 retry_delay: float = 1.0,
+                 poll_interval: float = 1.0,
+                 poll_batch: int = 50,
+                 lease: float = 60.0):
+        self.pool = pool
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.poll_batch = poll_batch
+        self.lease = lease
+
+        self.handlers: dict[str, Callable[[Any], Awaitable[None]]] = {}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self.enqueued = 0
+        self.spilled = 0
+        self.claimed = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.running = 0
+
+        self._workers: list[asyncio.Task] = []
+        self._poller: Optional[asyncio.Task] = None
+
+    def handler(self, name: str):
+        def register(func: Callable[[Any], Awaitable[None]]):
+            self.handlers[name] = func
+            return func
+
+        return register
+
+    async def enqueue(self, name: str, payload: Any):
+        if name not in self.handlers:
+            raise ValueError(f"unknown job: {name}")
+
+        # handlers always see decoded JSON, whether the job stayed in memory or went through the table
+        job = Job(name, orjson.loads(orjson.dumps(payload)))
+
+        try:
+            self.queue.put_nowait(job)
+            self.enqueued += 1
+        except asyncio.QueueFull:
+            await self._store(job, 0, 0.0)
+            self.spilled += 1
+
+    async def start(self):
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        tasks = [*self._workers, self._poller] if self._poller is not None else list(self._workers)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._workers = []
+        self._poller = None
+
+        # whatever is still queued in memory goes to the table so the next worker picks it up
+        while not self.queue.empty():
+            job = self.queue.get_nowait()
+            if job.id is None:
+                await self._store(job, job.attempts, 0.0)
+                self.spilled += 1
+
+    async def _work(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            except Exception:
+                # bookkeeping failed (pool closed, connection lost); claimed jobs come back after their lease,
+                # and the worker itself must survive to serve the next one
+                logger.exception("job bookkeeping failed", extra={"fields": {"job": job.name}})
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job):
+        self.running += 1
+        try:
+            handler = self.handlers.get(job.name)
+            if handler is None:
+                raise ValueError(f"unknown job: {job.name}")
+
+            await handler(job.payload)
+
+        except asyncio.CancelledError:
+            # claimed jobs come back once their lease runs out; in-memory ones have to be saved now
+            if job.id is None:
+                await self._store(job, job.attempts, 0.0)
+                self.spilled += 1
+            raise
+
+        except Exception as err:
+            logger.warning("job failed", extra={"fields": {"job": job.name, "attempts": job.attempts + 1,
+                                                           "error": repr(err)}})
+            await self._retry(job, repr(err))
+
+        else:
+            self.completed += 1
+            if job.id is not None:
+                async with self.pool.acquire() as connection:
+                    await connection.execute(QUERY_DELETE_JOB, job.id)
+
+        finally:
+            self.running -= 1
+
+    async def _retry(self, job: Job, error: str):
+        attempts = job.attempts + 1
+        failed = attempts >= self.max_attempts
+        delay = self.retry_delay * 2 ** (attempts - 1)
+
+        if failed:
+            self.failed += 1
+        else:
+            self.retried += 1
+
+        # retries always go through the table so a crash between attempts does not lose the job
+        async with self.pool.acquire() as connection:
+            if job.id is None:
+                await connection.execute(
+                    QUERY_INSERT_JOB, job.name, job.payload, attempts, delay, failed, error
+                )
+            else:
+                await connection.execute(QUERY_RETRY_JOB, job.id, attempts, delay, failed, error)
+
+    async def _store(self, job: Job, attempts: int, delay: float):
+        async with self.pool.acquire() as connection:
+            await connection.execute(QUERY_INSERT_JOB, job.name, job.payload, attempts, delay, False, None)
+
+    async def _poll(self):
+        while True:
+            claimed = 0
+            room = self.queue.maxsize - self.queue.qsize()
+
+            if room > 0:
+                try:
+                    async with self.pool.acquire() as connection:
+                        rows = await connection.fetch(QUERY_CLAIM_JOBS, min(room, self.poll_batch), self.lease)
+                except Exception:
+                    logger.exception("job poll failed")
+                    rows = []
+
+                for row in rows:
+                    try:
+                        self.queue.put_nowait(Job(row["name"], row["payload"], row["attempts"], row["id"]))
+                    except asyncio.QueueFull:
+                        # requests filled the queue meanwhile; the rest is picked up again when the lease expires
+                        break
+                    claimed += 1
+
+                self.claimed += claimed
+
+            # keep draining while the table has a backlog
+            if claimed < self.poll_batch:
+                await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "running": self.running,
+            "enqueued": self.enqueued,
+            "spilled": self.spilled,
+            "claimed": self.claimed,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
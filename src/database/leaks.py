@@ -0,0 +1,54 @@
+import time
+import itertools
+
+
+class ConnectionTracker:
+    def __init__(self, leak_threshold: float = 30.0):
+        self.leak_threshold = leak_threshold
+
+        self.opened = 0
+        self.closed = 0
+        self.acquired = 0
+        self.released = 0
+
+        self._borrowed: dict[int, float] = {}
+        self._ids = itertools.count()
+
+    @property
+    def open(self) -> int:
+        return self.opened - self.closed
+
+    @property
+    def borrowed(self) -> int:
+        return len(self._borrowed)
+
+    def connection_opened(self):
+        self.opened += 1
+
+    def connection_closed(self):
+        self.closed += 1
+
+    def borrow(self) -> int:
+        token = next(self._ids)
+        self._borrowed[token] = time.monotonic()
+        self.acquired += 1
+        return token
+
+    def release(self, token: int):
+        if self._borrowed.pop(token, None) is not None:
+            self.released += 1
+
+    def suspected_leaks(self) -> int:
+        deadline = time.monotonic() - self.leak_threshold
+        return sum(1 for borrowed_at in self._borrowed.values() if borrowed_at < deadline)
+
+    def stats(self) -> dict:
+        return {
+            "open": self.open,
+            "borrowed": self.borrowed,
+            "opened_total": self.opened,
+            "closed_total": self.closed,
+            "acquired_total": self.acquired,
+            "released_total": self.released,
+            "suspected_leaks": self.suspected_leaks(),
+        }
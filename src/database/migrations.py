@@ -0,0 +1,155 @@
+import json
+import asyncio
+import asyncpg
+
+from typing import NamedTuple
+from datetime import datetime, timedelta
+
+from src.config.database_config import QUERY_CREATE_TABLES, QUERY_ADD_KEYS_AND_INDEXES, QUERY_CREATE_TASK_ANALYTICS, \
+    QUERY_CREATE_TASK_NOTIFICATIONS, QUERY_CREATE_TASK_SEARCH, QUERY_PARTITION_TASKS, \
+    QUERY_ADD_TASK_VERSIONS, QUERY_CREATE_JOBS, QUERY_CREATE_TOKEN_REVOCATIONS, QUERY_ADD_USER_TOKEN_VERSIONS, \
+    QUERY_ARCHIVE_BY_STATUS_CHANGE, QUERY_ADD_STATUS_TIME_DAYS, QUERY_CREATE_MIGRATIONS_TABLE, QUERY_LOCK_MIGRATIONS, \
+    QUERY_GET_SCHEMA_VERSION, QUERY_RECORD_MIGRATION, QUERY_MIGRATIONS_TABLE_EXISTS, QUERY_GET_TASK_FOR_ANALYTICS
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    sql: str
+
+
+MIGRATIONS = [
+    Migration(1, "initial schema", QUERY_CREATE_TABLES),
+    Migration(2, "primary keys and task indexes", QUERY_ADD_KEYS_AND_INDEXES),
+    Migration(3, "task analytics rollups", QUERY_CREATE_TASK_ANALYTICS),
+    Migration(4, "task change notifications", QUERY_CREATE_TASK_NOTIFICATIONS),
+    Migration(5, "task full-text search", QUERY_CREATE_TASK_SEARCH),
+    Migration(6, "monthly task partitions and archive", QUERY_PARTITION_TASKS),
+    Migration(7, "task versions", QUERY_ADD_TASK_VERSIONS),
+    Migration(8, "background jobs", QUERY_CREATE_JOBS),
+    Migration(9, "token revocations", QUERY_CREATE_TOKEN_REVOCATIONS),
+    Migration(10, "per-user token versions", QUERY_ADD_USER_TOKEN_VERSIONS),
+    Migration(11, "archive tasks by time in done", QUERY_ARCHIVE_BY_STATUS_CHANGE),
+    Migration(12, "time in status per day", QUERY_ADD_STATUS_TIME_DAYS),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+async def get_schema_version(connection: asyncpg.Connection) -> int:
+    await connection.execute(QUERY_CREATE_MIGRATIONS_TABLE)
+    return await connection.fetchval(QUERY_GET_SCHEMA_VERSION)
+
+
+async def is_current(connection: asyncpg.Connection) -> bool:
+    # read-only check: no DDL and no lock, so booting workers do not queue behind each other
+    if not await connection.fetchval(QUERY_MIGRATIONS_TABLE_EXISTS):
+        return False
+
+    return await connection.fetchval(QUERY_GET_SCHEMA_VERSION) >= LATEST_VERSION
+
+
+async def upgrade(connection: asyncpg.Connection) -> list[int]:
+    if await is_current(connection):
+        return []
+
+    applied = []
+
+    # one transaction guarded by an advisory lock, so concurrently booting workers apply each migration once
+    async with connection.transaction():
+        await connection.execute(QUERY_LOCK_MIGRATIONS)
+        current = await get_schema_version(connection)
+
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+
+            await connection.execute(migration.sql)
+            await connection.execute(QUERY_RECORD_MIGRATION, migration.version, migration.name)
+            applied.append(migration.version)
+
+    return applied
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+EXPLAIN_CHECKS = {
+    "analytics": (
+        QUERY_GET_TASK_FOR_ANALYTICS,
+        lambda: ("00000000-0000-0000-0000-000000000000", "todo",
+                 datetime.now() - timedelta(days=30), datetime.now())
+    ),
+    "filter_by_status": (
+        "SELECT * FROM tasks WHERE status = $1 ORDER BY created_at DESC LIMIT 50",
+        lambda: ("todo",)
+    ),
+    "filter_by_user": (
+        "SELECT * FROM tasks WHERE user_id = $1 ORDER BY created_at DESC LIMIT 50",
+        lambda: ("00000000-0000-0000-0000-000000000000",)
+    ),
+    "latest_page": (
+        "SELECT * FROM tasks ORDER BY created_at DESC, id DESC LIMIT 50",
+        lambda: ()
+    ),
+    "search": (
+        "SELECT id FROM tasks WHERE search_vector @@ to_tsquery('simple', $1) OR title % $2",
+        lambda: ("report:*", "report")
+    ),
+    "weather_contains": (
+        "SELECT id FROM tasks WHERE weather @> $1::jsonb",
+        lambda: (json.dumps({"condition": "Cloudy"}),)
+    ),
+}
+
+
+async def explain_index_usage(connection: asyncpg.Connection) -> dict[str, dict]:
+    report = {}
+
+    async with connection.transaction():
+        # small tables are cheaper to scan sequentially; this asks whether an index *can* serve the query
+        await connection.execute("SET LOCAL enable_seqscan = off")
+
+        for name, (query, params) in EXPLAIN_CHECKS.items():
+            raw = await connection.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *params())
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            nodes = [node["Node Type"] for node in _plan_nodes(plan)]
+
+            report[name] = {
+                "nodes": nodes,
+                "uses_index": any("Index" in node for node in nodes),
+                "seq_scan": "Seq Scan" in nodes,
+            }
+
+    return report
+
+
+async def main(dsn: str, command: str):
+    connection = await asyncpg.connect(dsn=dsn)
+
+    try:
+        if command == "upgrade":
+            print({"applied": await upgrade(connection)})
+        elif command == "version":
+            print({"version": await get_schema_version(connection), "latest": LATEST_VERSION})
+        elif command == "explain":
+            report = await explain_index_usage(connection)
+            print(json.dumps(report, indent=2))
+
+            if any(check["seq_scan"] or not check["uses_index"] for check in report.values()):
+                raise SystemExit(1)
+        else:
+            raise SystemExit(f"unknown command: {command}")
+    finally:
+        await connection.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from src.settings import get_settings
+
+    asyncio.run(main(get_settings().DATABASE_URI, sys.argv[1] if len(sys.argv) > 1 else "upgrade"))
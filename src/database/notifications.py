@@ -0,0 +1,156 @@
+import asyncio
+
+import orjson
+import asyncpg
+
+from typing import Callable, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger("sobes.notifications")
+
+
+class Subscription:
+    def __init__(self, user_id: Optional[str] = None, status: Optional[str] = None, queue_size: int = 100):
+        self.user_id = user_id
+        self.status = status
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def matches(self, event: dict) -> bool:
+        if self.user_id is not None and event.get("user_id") != self.user_id:
+            return False
+
+        if self.status is not None and event.get("status") != self.status:
+            return False
+
+        return True
+
+    def push(self, event: dict):
+        # a slow consumer loses its oldest events instead of growing memory or stalling the fan-out;
+        # the dropped count is reported so the client knows to resync
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class ChangeFeed:
+    def __init__(self, dsn: str, channel: str, queue_size: int = 100, reconnect_delay: float = 1.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+
+        self.subscriptions: set[Subscription] = set()
+        self.listeners: list[tuple[str, Callable[[dict], None], Optional[Callable[[], None]]]] = []
+        self.connection: Optional[asyncpg.Connection] = None
+        self.received = 0
+
+        self._reconnect: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def start(self):
+        self._closing = False
+        try:
+            await self._connect()
+        except Exception as err:
+            logger.warning("change feed connect failed", extra={"fields": {"error": repr(err)}})
+            self._schedule_reconnect()
+
+    async def stop(self):
+        self._closing = True
+
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+            self._reconnect = None
+
+        if self.connection is not None and not self.connection.is_closed():
+            await self.connection.close()
+        self.connection = None
+
+    async def _connect(self):
+        # a dedicated connection: pooled connections run UNLISTEN * when they are released
+        connection = await asyncpg.connect(dsn=self.dsn)
+        connection.add_termination_listener(self._on_terminate)
+        for channel in self.channels:
+            await connection.add_listener(channel, self._on_notify)
+        self.connection = connection
+
+        for _, _, on_connect in self.listeners:
+            if on_connect is not None:
+                on_connect()
+
+    def _on_terminate(self, _):
+        self.connection = None
+        if not self._closing:
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._reconnect is None or self._reconnect.done():
+            self._reconnect = asyncio.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        delay = self.reconnect_delay
+        while not self._closing:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+                logger.info("change feed reconnected")
+                return
+            except Exception as err:
+                logger.warning("change feed reconnect failed", extra={"fields": {"error": repr(err)}})
+                delay = min(delay * 2, 30.0)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        self.received += 1
+        event = orjson.loads(payload)
+
+        for listened, on_event, _ in self.listeners:
+            if listened == channel:
+                on_event(event)
+
+        # subscribers only ever see task changes
+        if channel != self.channel:
+            return
+
+        for subscription in self.subscriptions:
+            if subscription.matches(event):
+                subscription.push(event)
+
+    @property
+    def channels(self) -> list[str]:
+        return list(dict.fromkeys([self.channel, *(channel for channel, _, _ in self.listeners)]))
+
+    def add_listener(self,
+                     on_event: Callable[[dict], None],
+                     on_connect: Optional[Callable[[], None]] = None,
+                     channel: Optional[str] = None):
+        # in-process consumers called inline for every event on their channel (the task channel by default);
+        # on_connect runs after each (re)connect. Every channel shares the one LISTEN connection, so
+        # listeners are added before start()
+        self.listeners.append((channel or self.channel, on_event, on_connect))
+
+    def subscribe(self, user_id: Optional[str] = None, status: Optional[str] = None) -> Subscription:
+        subscription = Subscription(user_id=user_id, status=status, queue_size=self.queue_size)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connection is not None,
+            "channels": self.channels,
+            "subscribers": len(self.subscriptions),
+            "received": self.received,
+        }
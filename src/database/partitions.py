@@ -0,0 +1,96 @@
+import asyncio
+
+from datetime import date, timedelta
+from typing import Optional
+
+from src.database.pool import ConnectionPool
+from src.config.database_config import QUERY_TRY_LOCK_MAINTENANCE, QUERY_UNLOCK_MAINTENANCE, \
+    QUERY_ENSURE_TASK_PARTITIONS, QUERY_ARCHIVE_DONE_TASKS, QUERY_DROP_EMPTY_TASK_PARTITIONS, \
+    QUERY_PURGE_TASK_ARCHIVE
+from src.utils.logger import get_logger
+
+logger = get_logger("sobes.partitions")
+
+
+class PartitionMaintainer:
+    def __init__(self,
+                 pool: ConnectionPool,
+                 months_ahead: int = 3,
+                 archive_after_days: int = 180,
+                 archive_batch: int = 5000,
+                 archive_retention_days: Optional[int] = None,
+                 interval: float = 3600.0):
+        self.pool = pool
+        self.months_ahead = months_ahead
+        self.archive_after_days = archive_after_days
+        self.archive_batch = archive_batch
+        self.archive_retention_days = archive_retention_days
+        self.interval = interval
+
+        self.last_run: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("task partition maintenance failed")
+
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> Optional[dict]:
+        async with self.pool.acquire() as connection:
+            # every worker runs this loop; whoever holds the lock does the work for this round
+            if not await connection.fetchval(QUERY_TRY_LOCK_MAINTENANCE):
+                return None
+
+            try:
+                return await self._maintain(connection)
+            finally:
+                await connection.fetchval(QUERY_UNLOCK_MAINTENANCE)
+
+    async def _maintain(self, connection) -> dict:
+        async with connection.transaction():
+            created = await connection.fetchval(QUERY_ENSURE_TASK_PARTITIONS, self.months_ahead)
+
+        archived = 0
+        while True:
+            # small batches in separate transactions keep locks and WAL bursts short
+            async with connection.transaction():
+                moved = await connection.fetchval(
+                    QUERY_ARCHIVE_DONE_TASKS, self.archive_after_days, self.archive_batch
+                )
+            archived += moved
+            if moved < self.archive_batch:
+                break
+
+        cutoff = date.today().replace(day=1) - timedelta(days=self.archive_after_days)
+        async with connection.transaction():
+            dropped = await connection.fetchval(QUERY_DROP_EMPTY_TASK_PARTITIONS, cutoff)
+
+        purged = 0
+        if self.archive_retention_days is not None:
+            status = await connection.execute(QUERY_PURGE_TASK_ARCHIVE, self.archive_retention_days)
+            purged = int(status.rsplit(" ", 1)[-1])
+
+        self.last_run = {
+            "partitions_created": created,
+            "tasks_archived": archived,
+            "partitions_dropped": dropped,
+            "archive_purged": purged,
+        }
+        logger.info("task partition maintenance", extra={"fields": self.last_run})
+        return self.last_run
@@ -0,0 +1,104 @@
+import time
+import orjson
+import asyncpg
+
+from contextlib import asynccontextmanager
+
+from src.database.leaks import ConnectionTracker
+from src.database.statements import StatementRegistry
+from src.utils.metrics import Metrics
+
+
+class ConnectionPool:
+    def __init__(self,
+                 dsn: str,
+                 min_size: int = 5,
+                 max_size: int = 20,
+                 max_inactive_connection_lifetime: float = 300.0,
+                 statement_cache_size: int = 100,
+                 tracker: ConnectionTracker | None = None,
+                 statements: StatementRegistry | None = None,
+                 observer: Metrics | None = None):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_inactive_connection_lifetime = max_inactive_connection_lifetime
+        self.statement_cache_size = statement_cache_size
+        self.tracker = tracker if tracker is not None else ConnectionTracker()
+        self.statements = statements if statements is not None else StatementRegistry(observer=observer)
+        self.observer = observer
+        self.pool: asyncpg.Pool | None = None
+
+    async def open(self):
+        if self.pool is not None:
+            return
+
+        try:
+            self.pool = await asyncpg.create_pool(
+                dsn=self.dsn,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                max_inactive_connection_lifetime=self.max_inactive_connection_lifetime,
+                statement_cache_size=self.statement_cache_size,
+                init=self._on_connect
+            )
+        except Exception as err:
+            raise RuntimeError(err)
+
+    async def close(self):
+        if self.pool is None:
+            return
+
+        try:
+            await self.pool.close()
+        finally:
+            self.pool = None
+
+    async def _on_connect(self, connection: asyncpg.Connection):
+        # decode jsonb straight into Python objects once, so responses never re-parse it;
+        # binary jsonb is a version byte followed by the JSON text, which also keeps COPY working
+        await connection.set_type_codec(
+            "jsonb",
+            encoder=lambda value: b"\x01" + orjson.dumps(value),
+            decoder=lambda data: orjson.loads(data[1:]),
+            schema="pg_catalog",
+            format="binary"
+        )
+
+        backend_pid = connection.get_server_pid()
+        self.tracker.connection_opened()
+
+        def on_terminate(_):
+            self.tracker.connection_closed()
+            self.statements.forget(backend_pid)
+
+        connection.add_termination_listener(on_terminate)
+
+    @asynccontextmanager
+    async def acquire(self):
+        if self.pool is None:
+            raise RuntimeError("Connection pool is not opened")
+
+        started = time.perf_counter()
+        async with self.pool.acquire() as connection:
+            if self.observer is not None:
+                self.observer.observe_acquire(time.perf_counter() - started)
+
+            token = self.tracker.borrow()
+            try:
+                yield connection
+            finally:
+                self.tracker.release(token)
+
+    @asynccontextmanager
+    async def transaction(self):
+        async with self.acquire() as connection:
+            async with connection.transaction():
+                yield connection
+
+    def stats(self) -> dict:
+        stats = self.tracker.stats()
+        stats["pool_size"] = self.pool.get_size() if self.pool is not None else 0
+        stats["pool_idle"] = self.pool.get_idle_size() if self.pool is not None else 0
+        stats["pool_max_size"] = self.max_size
+        return stats
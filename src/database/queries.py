@@ -0,0 +1,103 @@
+import re
+
+from functools import lru_cache
+
+TASK_UPDATE_COLUMNS = ("title", "description", "status", "created_at", "city", "weather")
+TASK_FILTERS = ("status", "user", "date")
+
+TASK_COLUMNS = "id, user_id, title, description, status, created_at, city, weather, version"
+
+_FILTER_SQL = {
+    "status": "status = ${}",
+    "user": "user_id = ${}",
+    "date": "created_at >= ${}",
+}
+
+
+def _canonical(names, allowed: tuple[str, ...], kind: str) -> tuple[str, ...]:
+    unknown = set(names) - set(allowed)
+    if unknown:
+        raise ValueError(f"unknown {kind}: {', '.join(sorted(unknown))}")
+
+    return tuple(name for name in allowed if name in names)
+
+
+def build_update_query(columns, versioned: bool = False) -> tuple[str, tuple[str, ...], str]:
+    return _build_update_query(_canonical(columns, TASK_UPDATE_COLUMNS, "column"), versioned)
+
+
+@lru_cache(maxsize=None)
+def _build_update_query(columns: tuple[str, ...], versioned: bool) -> tuple[str, tuple[str, ...], str]:
+    # values are the columns in order, then id, user_id, is_admin and, when versioned, the expected version
+    if not columns:
+        raise ValueError("no columns to update")
+
+    set_clause = ", ".join(f"{column} = ${i}" for i, column in enumerate(columns, start=1))
+    i = len(columns) + 1
+
+    query = f"UPDATE tasks SET {set_clause} WHERE id = ${i} AND (user_id = ${i + 1} OR ${i + 2}::boolean)"
+    if versioned:
+        query += f" AND version = ${i + 3}"
+    query += f" RETURNING {TASK_COLUMNS}"
+
+    name = f"update_task:{','.join(columns)}:{'versioned' if versioned else 'any'}"
+    return name, columns, query
+
+
+def build_task_list_query(filters, after: bool = False, paginated: bool = True) -> tuple[str, tuple[str, ...], str]:
+    return _build_task_list_query(_canonical(filters, TASK_FILTERS, "filter"), after, paginated)
+
+
+@lru_cache(maxsize=None)
+def _build_task_list_query(filters: tuple[str, ...], after: bool, paginated: bool) -> tuple[str, tuple[str, ...], str]:
+    conditions = [_FILTER_SQL[name].format(i) for i, name in enumerate(filters, start=1)]
+    i = len(filters) + 1
+
+    if after:
+        # the plain created_at bound lets the planner prune partitions; the row comparison alone cannot
+        conditions.append(f"created_at <= ${i} AND (created_at, id) < (${i}, ${i + 1})")
+        i += 2
+
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    query = f"SELECT {TASK_COLUMNS} FROM tasks WHERE {where_clause} ORDER BY created_at DESC, id DESC"
+
+    if paginated:
+        query += f" LIMIT ${i}"
+
+    name = f"list_tasks:{','.join(filters) or '-'}:{'after' if after else 'first'}:{'page' if paginated else 'all'}"
+    return name, filters, query
+
+
+def prefix_tsquery(text: str) -> str | None:
+    # only word characters reach to_tsquery, so user input can never produce a syntax error
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def build_task_search_query(filters) -> tuple[str, tuple[str, ...], str]:
+    return _build_task_search_query(_canonical(filters, TASK_FILTERS, "filter"))
+
+
+@lru_cache(maxsize=None)
+def _build_task_search_query(filters: tuple[str, ...]) -> tuple[str, tuple[str, ...], str]:
+    # $1 is the prefix tsquery, $2 the raw text for trigram matching; filters follow, then the candidate
+    # cap and limit/offset. Only the first matches the indexes yield are ranked: common words match a
+    # large share of the table and ranking all of them costs seconds. Typos are matched against single
+    # words of the title (<%), whole-title similarity rarely passes for a one-word query
+    conditions = ["(search_vector @@ to_tsquery('simple', $1) OR $2 <% title)"]
+    conditions.extend(_FILTER_SQL[name].format(i) for i, name in enumerate(filters, start=3))
+    i = len(filters) + 3
+
+    query = (
+        f"SELECT {TASK_COLUMNS}, "
+        f"ts_rank_cd(search_vector, to_tsquery('simple', $1)) + word_similarity($2, title) AS rank "
+        f"FROM (SELECT {TASK_COLUMNS}, search_vector FROM tasks WHERE {' AND '.join(conditions)} "
+        f"LIMIT ${i}) AS candidates "
+        f"ORDER BY rank DESC, created_at DESC, id DESC "
+        f"LIMIT ${i + 1} OFFSET ${i + 2}"
+    )
+
+    return f"search_tasks:{','.join(filters) or '-'}", filters, query
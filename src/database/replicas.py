@@ -0,0 +1,123 @@
+import asyncio
+import itertools
+
+import asyncpg
+
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from src.database.pool import ConnectionPool
+from src.config.database_config import QUERY_REPLICA_LAG
+from src.utils.logger import get_logger
+
+logger = get_logger("sobes.replicas")
+
+CONNECT_ERRORS = (OSError, asyncio.TimeoutError, asyncpg.exceptions.PostgresConnectionError,
+                  asyncpg.exceptions.CannotConnectNowError, RuntimeError)
+
+
+class ReplicaRouter:
+    def __init__(self,
+                 primary: ConnectionPool,
+                 replicas: list[ConnectionPool],
+                 check_interval: float = 5.0,
+                 check_timeout: float = 2.0,
+                 max_lag: float | None = None):
+        self.primary = primary
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.max_lag = max_lag
+
+        self.healthy = [False] * len(replicas)
+        self.lag: list[float | None] = [None] * len(replicas)
+        self.fallbacks = 0
+
+        self._turn = itertools.count()
+        self._monitor: asyncio.Task | None = None
+
+    async def open(self):
+        await asyncio.gather(*(self._check(index) for index in range(len(self.replicas))))
+
+        if self.replicas:
+            self._monitor = asyncio.create_task(self._monitor_loop())
+
+    async def close(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+        for replica in self.replicas:
+            await replica.close()
+
+    async def _check(self, index: int):
+        replica = self.replicas[index]
+
+        try:
+            if replica.pool is None:
+                await replica.open()
+
+            async with replica.acquire() as connection:
+                lag = await asyncio.wait_for(connection.fetchval(QUERY_REPLICA_LAG), self.check_timeout)
+
+            self.lag[index] = lag
+            healthy = self.max_lag is None or lag is None or lag <= self.max_lag
+        except Exception as err:
+            healthy = False
+            logger.warning("replica check failed", extra={"fields": {"replica": index, "error": repr(err)}})
+
+        if healthy != self.healthy[index]:
+            logger.info("replica state changed", extra={"fields": {"replica": index, "healthy": healthy}})
+
+        self.healthy[index] = healthy
+
+    async def _monitor_loop(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await asyncio.gather(*(self._check(index) for index in range(len(self.replicas))))
+
+    def _candidates(self) -> list[int]:
+        if not self.replicas:
+            return []
+
+        start = next(self._turn) % len(self.replicas)
+        order = [(start + offset) % len(self.replicas) for offset in range(len(self.replicas))]
+        return [index for index in order if self.healthy[index]]
+
+    @asynccontextmanager
+    async def acquire(self):
+        for index in self._candidates():
+            async with AsyncExitStack() as stack:
+                try:
+                    connection = await stack.enter_async_context(self.replicas[index].acquire())
+                except CONNECT_ERRORS:
+                    # fail over immediately; the monitor brings the replica back once it answers again
+                    self.healthy[index] = False
+                    continue
+
+                yield self.replicas[index], connection
+                return
+
+        if self.replicas:
+            self.fallbacks += 1
+
+        async with self.primary.acquire() as connection:
+            yield self.primary, connection
+
+    @asynccontextmanager
+    async def transaction(self):
+        async with self.acquire() as (pool, connection):
+            async with connection.transaction(readonly=True):
+                yield pool, connection
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {"healthy": healthy, "lag_seconds": lag, "connections": replica.stats()}
+                for healthy, lag, replica in zip(self.healthy, self.lag, self.replicas)
+            ],
+            "primary_fallbacks": self.fallbacks,
+        }
@@ -0,0 +1,60 @@
+import asyncio
+
+from typing import Optional
+
+from src.database.notifications import ChangeFeed
+from src.config.database_config import TOKEN_REVOCATIONS_CHANNEL
+from src.utils.revocation import TokenRevocations
+from src.utils.logger import get_logger
+
+logger = get_logger("sobes.revocations")
+
+
+class RevocationSync:
+    # users.token_version is the shared record; every worker keeps the bumped versions in memory and
+    # follows the trigger's NOTIFY, so checking a token never costs a query. A reconnect may have missed
+    # events and reloads. It rides on the task change feed's LISTEN connection
+    def __init__(self, db, feed: ChangeFeed, revocations: TokenRevocations):
+        self.db = db
+        self.revocations = revocations
+
+        self.loaded = 0
+        self._started = False
+        self._loading: Optional[asyncio.Task] = None
+
+        feed.add_listener(self._on_event, self._on_connect, channel=TOKEN_REVOCATIONS_CHANNEL)
+
+    async def start(self):
+        # the feed is already listening, so nothing bumped from here on is missed
+        self._started = True
+        await self.load()
+
+    async def stop(self):
+        self._started = False
+
+        if self._loading is not None:
+            self._loading.cancel()
+            self._loading = None
+
+    async def load(self):
+        try:
+            rows = await self.db.get_token_versions()
+        except Exception:
+            logger.exception("token versions load failed")
+            return
+
+        for row in rows:
+            self.revocations.revoke_user(str(row["id"]), row["token_version"])
+
+        self.loaded += 1
+
+    def _on_event(self, event: dict):
+        self.revocations.revoke_user(event["user_id"], event["token_version"])
+
+    def _on_connect(self):
+        # the first connect happens before migrations; start() does that load
+        if self._started:
+            self._loading = asyncio.create_task(self.load())
+
+    def stats(self) -> dict:
+        return {"loaded": self.loaded, "revoked_users": len(self.revocations)}
@@ -0,0 +1,121 @@
+import time
+
+import asyncpg
+
+from src.utils.metrics import Metrics
+
+
+class StatementStats:
+    def __init__(self):
+        self._stats: dict[str, dict] = {}
+
+    def _entry(self, name: str) -> dict:
+        entry = self._stats.get(name)
+        if entry is None:
+            entry = self._stats[name] = {
+                "first_executions": 0,
+                "first_execution_seconds": 0.0,
+                "executions": 0,
+                "execute_seconds": 0.0,
+            }
+        return entry
+
+    def record_first_execution(self, name: str, seconds: float):
+        entry = self._entry(name)
+        entry["first_executions"] += 1
+        entry["first_execution_seconds"] += seconds
+
+    def record_execute(self, name: str, seconds: float):
+        entry = self._entry(name)
+        entry["executions"] += 1
+        entry["execute_seconds"] += seconds
+
+    def report(self) -> dict:
+        report = {}
+        for name, entry in self._stats.items():
+            executions = entry["executions"]
+            first_executions = entry["first_executions"]
+            report[name] = {
+                **entry,
+                # the whole first run on a backend, parse and plan included; prepare time alone is not measured
+                "mean_first_execution_ms": (
+                    entry["first_execution_seconds"] / first_executions * 1000 if first_executions else 0.0
+                ),
+                "mean_execute_ms": entry["execute_seconds"] / executions * 1000 if executions else 0.0,
+                # parse/analyze work avoided by reusing the prepared statement
+                "reuse_ratio": 1 - first_executions / executions if executions else 0.0,
+            }
+        return report
+
+
+class StatementRegistry:
+    # asyncpg keeps its own per-connection statement cache, and a PreparedStatement handle dies when its
+    # connection is released to the pool; this only names and times queries and tracks first use per backend
+    def __init__(self, stats: StatementStats | None = None, observer: Metrics | None = None):
+        self.stats = stats if stats is not None else StatementStats()
+        self.observer = observer
+        self._by_backend: dict[int, set[str]] = {}
+
+    def forget(self, backend_pid: int):
+        self._by_backend.pop(backend_pid, None)
+
+    def _first_use(self, connection: asyncpg.Connection, name: str) -> bool:
+        seen = self._by_backend.setdefault(connection.get_server_pid(), set())
+        if name in seen:
+            return False
+
+        seen.add(name)
+        return True
+
+    def _record(self, name: str, started: float, rows: int, first_use: bool):
+        elapsed = time.perf_counter() - started
+        if first_use:
+            # the first run on a backend includes asyncpg's implicit prepare
+            self.stats.record_first_execution(name, elapsed)
+        self.stats.record_execute(name, elapsed)
+
+        if self.observer is not None:
+            self.observer.observe_query(name, elapsed, rows)
+
+    async def fetch(self, connection: asyncpg.Connection, name: str, query: str, *args):
+        first_use = self._first_use(connection, name)
+
+        started = time.perf_counter()
+        result = await connection.fetch(query, *args)
+        self._record(name, started, len(result), first_use)
+        return result
+
+    async def fetchrow(self, connection: asyncpg.Connection, name: str, query: str, *args):
+        first_use = self._first_use(connection, name)
+
+        started = time.perf_counter()
+        row = await connection.fetchrow(query, *args)
+        self._record(name, started, 0 if row is None else 1, first_use)
+        return row
+
+    async def fetchval(self, connection: asyncpg.Connection, name: str, query: str, *args):
+        first_use = self._first_use(connection, name)
+
+        started = time.perf_counter()
+        value = await connection.fetchval(query, *args)
+        self._record(name, started, 0 if value is None else 1, first_use)
+        return value
+
+    async def copy_records(self, connection: asyncpg.Connection, name: str, table: str, records: list,
+                           columns: tuple[str, ...]) -> str:
+        # COPY is never prepared, so there is no first use to record
+        started = time.perf_counter()
+        status = await connection.copy_records_to_table(table, records=records, columns=columns)
+        self._record(name, started, len(records), False)
+        return status
+
+    async def execute(self, connection: asyncpg.Connection, name: str, query: str, *args) -> str:
+        first_use = self._first_use(connection, name)
+
+        started = time.perf_counter()
+        status = await connection.execute(query, *args)
+
+        # "UPDATE 3" / "INSERT 0 1": the affected row count is the last token
+        affected = status.rsplit(" ", 1)[-1]
+        self._record(name, started, int(affected) if affected.isdigit() else 0, first_use)
+        return status
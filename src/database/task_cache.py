@@ -0,0 +1,84 @@
+import sys
+import uuid
+
+from typing import Awaitable, Callable, Optional
+
+from src.utils.cache import AsyncTTLCache
+from src.database.notifications import ChangeFeed
+
+
+class TaskRecord:
+    # a slotted record takes well under half the memory of the equivalent dict
+    __slots__ = ("id", "user_id", "title", "description", "status", "created_at", "city", "weather", "version")
+
+    def __init__(self, id, user_id, title, description, status, created_at, city, weather, version):
+        self.id = id
+        self.user_id = user_id
+        self.title = title
+        self.description = description
+        self.status = status
+        self.created_at = created_at
+        self.city = city
+        self.weather = weather
+        self.version = version
+
+    @classmethod
+    def from_row(cls, row) -> "TaskRecord":
+        return cls(*(row[name] for name in cls.__slots__))
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def footprint(self) -> int:
+        return sys.getsizeof(self) + sum(sys.getsizeof(getattr(self, name)) for name in self.__slots__)
+
+
+class LocalInvalidation:
+    # single-worker deployments: the Database write paths already evict their own entries
+    def attach(self, cache: "TaskCache"):
+        pass
+
+
+class NotifyInvalidation:
+    # the tasks_notify trigger already announces every insert, update and delete,
+    # so other workers only have to listen; a reconnect may have missed events and drops everything
+    def __init__(self, feed: ChangeFeed):
+        self.feed = feed
+
+    def attach(self, cache: "TaskCache"):
+        self.feed.add_listener(
+            lambda event: cache.invalidate(uuid.UUID(event["id"])),
+            cache.clear
+        )
+
+
+class TaskCache:
+    def __init__(self, maxsize: int = 10000, ttl: float = 30.0, invalidation=None):
+        self.cache = AsyncTTLCache(maxsize=maxsize, ttl=ttl)
+        self.invalidation = invalidation if invalidation is not None else LocalInvalidation()
+        self.invalidation.attach(self)
+
+        self.invalidations = 0
+
+    async def get_or_load(self,
+                          task_id: uuid.UUID,
+                          loader: Callable[[], Awaitable[Optional[TaskRecord]]]) -> Optional[TaskRecord]:
+        return await self.cache.get_or_load(task_id, loader)
+
+    def invalidate(self, task_id: uuid.UUID):
+        self.invalidations += 1
+        self.cache.invalidate(task_id)
+
+    def invalidate_many(self, task_ids):
+        for task_id in task_ids:
+            self.invalidate(task_id)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            "invalidations": self.invalidations,
+            "memory_bytes": sum(record.footprint() for record in self.cache.values()),
+        }
@@ -0,0 +1,13 @@
+from pydantic import UUID4, BaseModel
+
+from src.models.enums.role_enums import Role
+
+class Principal(BaseModel):
+    user_id: UUID4
+    role: Role
+    token_version: int
+    epoch: int
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == Role.admin
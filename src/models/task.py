@@ -1,17 +1,28 @@
 from pydantic import UUID4, BaseModel, Json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from datetime import datetime
 
 from src.models.enums.status_enums import Status
 
 class TaskResponse(BaseModel):
     id: UUID4
-    user_id: int
+    user_id: UUID4
     title: str
     description: str
     status: Status
-    created_at: float
-    city: Optional[str]
-    weather: Optional[Dict[str, Any]]
+    created_at: Optional[datetime] = None
+    city: Optional[str] = None
+    weather: Optional[Dict[str, Any]] = None
+    version: Optional[int] = None
+
+
+class TaskResult(BaseModel):
+    result: TaskResponse
+
+
+class TaskListResponse(BaseModel):
+    result: List[TaskResponse]
+    next_cursor: Optional[str] = None
 
 
 class TaskGet(BaseModel):
@@ -20,4 +31,19 @@ class TaskGet(BaseModel):
     status: Status
     created_at: float
     city: Optional[str] = None
-    weather: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    weather: Optional[Dict[str, Any]] = None
+
+
+class TaskPatch(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[Status] = None
+    created_at: Optional[float] = None
+    city: Optional[str] = None
+    weather: Optional[Dict[str, Any]] = None
+    version: Optional[int] = None
+
+
+class TaskBulkStatusUpdate(BaseModel):
+    ids: List[UUID4]
+    status: Status
@@ -10,4 +10,7 @@ class UserResponse(BaseModel):
 class UserGetInfo(BaseModel):
     username: str
     role: Role
-    password: str
\ No newline at end of file
+    password: str
+
+class UserRoleUpdate(BaseModel):
+    role: Role
@@ -1,11 +1,121 @@
+from functools import lru_cache
+from typing import Literal
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings  # не просто BaseModel
 
 class Settings(BaseSettings):
       SECRET: str
       DATABASE_URI: str
       ACCESS_TOKEN_EXPIRE_MINUTES: int
+      TOKEN_EPOCH: int = 0
+
+      PASSWORD_BCRYPT_ROUNDS: int = 12
+      PASSWORD_HASH_WORKERS: int = 4
+
+      # connections the whole server may hold on one database, below its max_connections. Each of the
+      # SERVER_WORKERS keeps one LISTEN connection and a pool of at most DB_POOL_MAX_SIZE from its share
+      DB_MAX_CONNECTIONS: int = 90
+      DB_POOL_MIN_SIZE: int = 5
+      DB_POOL_MAX_SIZE: int = 20
+      DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME: float = 300.0
+      # per connection; the query builders alone can produce 126 update, 32 list and 8 search statements
+      DB_STATEMENT_CACHE_SIZE: int = 256
+      DB_LEAK_THRESHOLD: float = 30.0
+
+      DATABASE_REPLICA_URIS: str = ""
+      DB_REPLICA_CHECK_INTERVAL: float = 5.0
+      DB_REPLICA_MAX_LAG: float | None = 10.0
+
+      TASKS_PAGE_SIZE: int = 50
+      TASKS_PAGE_SIZE_MAX: int = 500
+      TASKS_STREAM_PREFETCH: int = 500
+      TASKS_BULK_MAX: int = 10000
+      TASKS_SEARCH_MAX_OFFSET: int = 1000
+      # matches ranked per search; pages past it rank offset + limit matches instead
+      TASKS_SEARCH_CANDIDATES: int = 1000
+
+      METRICS_LOG_SAMPLE_RATE: float = 0.01
+      METRICS_SLOW_REQUEST_SECONDS: float = 1.0
+
+      WEATHER_ENABLED: bool = False
+      # the stub makes forecasts up from the city name; it is only for tests and benchmarks
+      WEATHER_PROVIDER: Literal["openweather", "stub"] = "openweather"
+      OPENWEATHER_API_KEY: str | None = None
+      WEATHER_CACHE_TTL: float = 600.0
+      WEATHER_CACHE_MAXSIZE: int = 1000
+
+      RATE_LIMIT_BACKEND: str = "memory"
+      REDIS_URL: str | None = None
+      RATE_LIMIT_AUTH_PER_MINUTE: int = 20
+      RATE_LIMIT_AUTH_BURST: int = 5
+      RATE_LIMIT_IP_PER_MINUTE: int = 1200
+      RATE_LIMIT_IP_BURST: int = 200
+      RATE_LIMIT_USER_PER_MINUTE: int = 600
+      RATE_LIMIT_USER_BURST: int = 100
+
+      TASK_CACHE_TTL: float = 30.0
+      TASK_CACHE_MAXSIZE: int = 10000
+      TASK_CACHE_INVALIDATION: str = "notify"
+
+      TASKS_PARTITION_MONTHS_AHEAD: int = 3
+      TASKS_ARCHIVE_AFTER_DAYS: int = 180
+      TASKS_ARCHIVE_BATCH: int = 5000
+      TASKS_ARCHIVE_RETENTION_DAYS: int | None = None
+      TASKS_MAINTENANCE_INTERVAL: float = 3600.0
+
+      JOBS_CONCURRENCY: int = 4
+      JOBS_QUEUE_SIZE: int = 1000
+      JOBS_MAX_ATTEMPTS: int = 5
+      JOBS_RETRY_DELAY: float = 1.0
+      JOBS_POLL_INTERVAL: float = 1.0
+      JOBS_POLL_BATCH: int = 50
+      JOBS_LEASE_SECONDS: float = 60.0
+
+      CHANGE_FEED_QUEUE_SIZE: int = 100
+      CHANGE_FEED_KEEPALIVE: float = 15.0
+
+      SERVER_HOST: str = "0.0.0.0"
+      SERVER_PORT: int = 8000
+      SERVER_WORKERS: int = 0
+      SERVER_BACKLOG: int = 2048
+      SERVER_KEEPALIVE_TIMEOUT: int = 5
+      SERVER_GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+      SERVER_LIMIT_CONCURRENCY: int | None = None
+
+      @property
+      def db_pool_max_size(self) -> int:
+            return min(self.DB_POOL_MAX_SIZE, self.DB_MAX_CONNECTIONS // max(self.SERVER_WORKERS, 1) - 1)
+
+      @property
+      def db_pool_min_size(self) -> int:
+            return min(self.DB_POOL_MIN_SIZE, self.db_pool_max_size)
+
+      @model_validator(mode="after")
+      def check_connection_budget(self):
+            if self.db_pool_max_size < 1:
+                  raise ValueError(
+                        f"DB_MAX_CONNECTIONS={self.DB_MAX_CONNECTIONS} leaves no pooled connection for each of "
+                        f"{max(self.SERVER_WORKERS, 1)} workers; every worker needs one for its pool and one to LISTEN"
+                  )
+            return self
+
+      @model_validator(mode="after")
+      def check_weather_provider(self):
+            if self.WEATHER_ENABLED and self.WEATHER_PROVIDER == "openweather" and not self.OPENWEATHER_API_KEY:
+                  raise ValueError("WEATHER_ENABLED with the openweather provider needs OPENWEATHER_API_KEY")
+            return self
+
+      @property
+      def replica_uris(self) -> list[str]:
+            return [uri.strip() for uri in self.DATABASE_REPLICA_URIS.split(",") if uri.strip()]
 
       class Config:
          env_file = "src/.env"
          env_file_encoding = "utf-8"
-         
\ No newline at end of file
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+      # .env is read once per process, on first use
+      return Settings()
@@ -1,4 +1,48 @@
+import asyncio
+
 from hashlib import sha256
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
 
 def hash_value(text: str):
-    return sha256(text.encode()).hexdigest()
\ No newline at end of file
+    return sha256(text.encode()).hexdigest()
+
+
+class PasswordHasher:
+    def __init__(self, rounds: int = 12, workers: int = 4):
+        # hex_sha256 matches the legacy unsalted hash_value() digests, which get upgraded on login
+        self.context = CryptContext(
+            schemes=["bcrypt", "hex_sha256"],
+            deprecated=["hex_sha256"],
+            bcrypt__rounds=rounds
+        )
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hasher"
+            )
+        return self._executor
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> tuple[bool, str | None]:
+        return await self._run(self.context.verify_and_update, password, password_hash)
+
+    async def dummy_verify(self):
+        await self._run(self.context.dummy_verify)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
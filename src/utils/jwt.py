@@ -2,27 +2,24 @@ from datetime import timedelta
 from datetime import datetime
 from datetime import timezone
 
-from src.settings import Settings
-
 import jwt
 
-settings = Settings()
-
-def create_access_token(payload_data: dict, expires_data: timedelta) -> str:
+def create_access_token(payload_data: dict, expires_data: timedelta, secret: str) -> str:
     to_encode = payload_data.copy()
-    expire = datetime.now(timezone.utc) + expires_data
+    issued_at = datetime.now(timezone.utc)
+    expire = issued_at + expires_data
 
     to_encode.update(
-        {"exp": expire}
+        {"exp": expire, "iat": issued_at}
     )
 
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, secret, algorithm="HS256")
     return encoded_jwt
 
 
-def verify_access_token(token: str) -> dict | None:
+def verify_access_token(token: str, secret: str) -> dict | None:
     try:
-        decoded_jwt = jwt.decode(token, settings.SECRET, algorithms="HS256")
+        decoded_jwt = jwt.decode(token, secret, algorithms="HS256")
         
         return decoded_jwt
     
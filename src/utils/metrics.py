@@ -0,0 +1,124 @@
+import random
+import bisect
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROWS_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+
+        for label_values, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+            total = cumulative + series[len(self.buckets)]
+            labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {total}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {total}")
+
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._series: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for label_values, value in self._series.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Metrics:
+    def __init__(self, log_sample_rate: float = 0.01, slow_request_seconds: float = 1.0):
+        self.log_sample_rate = log_sample_rate
+        self.slow_request_seconds = slow_request_seconds
+
+        self.requests = Histogram(
+            "http_request_duration_seconds", "Time spent handling a request per route",
+            ("method", "route", "status")
+        )
+        self.acquire = Histogram(
+            "db_pool_acquire_seconds", "Time spent waiting for a pooled connection"
+        )
+        self.queries = Histogram(
+            "db_query_duration_seconds", "Time spent executing a statement",
+            ("statement",)
+        )
+        self.rows = Histogram(
+            "db_query_rows", "Rows returned per statement execution",
+            ("statement",), ROWS_BUCKETS
+        )
+        self.jwt = Histogram(
+            "jwt_decode_seconds", "Time spent decoding and verifying access tokens"
+        )
+        self.errors = Counter(
+            "http_request_errors_total", "Requests that raised an unhandled exception",
+            ("method", "route")
+        )
+
+    def should_log(self, seconds: float) -> bool:
+        return seconds >= self.slow_request_seconds or random.random() < self.log_sample_rate
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        self.requests.observe(seconds, method, route, status)
+
+    def observe_error(self, method: str, route: str):
+        self.errors.inc(method, route)
+
+    def observe_acquire(self, seconds: float):
+        self.acquire.observe(seconds)
+
+    def observe_query(self, statement: str, seconds: float, rows: int):
+        self.queries.observe(seconds, statement)
+        self.rows.observe(rows, statement)
+
+    def observe_jwt(self, seconds: float):
+        self.jwt.observe(seconds)
+
+    def render(self) -> str:
+        lines = []
+        for metric in (self.requests, self.errors, self.acquire, self.queries, self.rows, self.jwt):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
@@ -0,0 +1,23 @@
+import json
+import base64
+
+from uuid import UUID
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, task_id: UUID) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(task_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(raw["c"]), UUID(raw["i"])
+    except (ValueError, KeyError, TypeError) as err:
+        raise InvalidCursorError(cursor) from err
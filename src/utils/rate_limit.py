@@ -0,0 +1,105 @@
+import math
+import time
+
+from collections import OrderedDict
+from typing import Protocol
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, rate: float, capacity: int) -> float:
+        ...
+
+    async def close(self):
+        ...
+
+
+class InMemoryTokenBucket:
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> [tokens, last refill]; ordered by last use so idle keys are evicted first
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    async def hit(self, key: str, rate: float, capacity: int) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            bucket = self._buckets[key] = [float(capacity), now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+
+        return (1 - bucket[0]) / rate
+
+    async def close(self):
+        self._buckets.clear()
+
+
+class RedisTokenBucket:
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+    local retry = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        retry = (1 - tokens) / rate
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(retry)
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        # the "redis" extra; only needed when a shared backend is configured
+        from redis import asyncio as redis
+
+        self.prefix = prefix
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(self.SCRIPT)
+
+    async def hit(self, key: str, rate: float, capacity: int) -> float:
+        return float(await self.script(keys=[self.prefix + key], args=[rate, capacity]))
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimit:
+    def __init__(self, backend: RateLimitBackend, name: str, per_minute: int, burst: int):
+        self.backend = backend
+        self.name = name
+        self.rate = per_minute / 60
+        self.capacity = burst
+
+    async def check(self, identity: str):
+        retry_after = await self.backend.hit(f"{self.name}:{identity}", self.rate, self.capacity)
+        if retry_after > 0:
+            raise RateLimitExceeded(retry_after)
@@ -0,0 +1,23 @@
+class TokenRevocations:
+    def __init__(self, epoch: int = 0):
+        self.epoch = epoch
+        self._token_versions: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._token_versions)
+
+    def revoke_user(self, user_id: str, token_version: int):
+        # tokens issued before the bump carry a lower version; events can arrive out of order
+        # with a reload, so the known version never moves backwards
+        user_id = str(user_id)
+        self._token_versions[user_id] = max(token_version, self._token_versions.get(user_id, token_version))
+
+    def bump_epoch(self) -> int:
+        self.epoch += 1
+        return self.epoch
+
+    def is_revoked(self, user_id: str, token_version: int, epoch: int) -> bool:
+        if epoch < self.epoch:
+            return True
+
+        return token_version < self._token_versions.get(str(user_id), 0)
@@ -0,0 +1,89 @@
+import asyncio
+import hashlib
+
+from typing import Optional, Protocol
+
+import httpx
+
+from src.utils.cache import AsyncTTLCache
+
+
+class WeatherProvider(Protocol):
+    async def fetch(self, city: str) -> Optional[dict]:
+        ...
+
+    async def close(self):
+        ...
+
+
+class StubWeatherProvider:
+    CONDITIONS = ("Clear", "Cloudy", "Rain", "Snow", "Fog")
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def fetch(self, city: str) -> Optional[dict]:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        # deterministic per city, so tests and benchmarks are reproducible
+        digest = hashlib.sha256(city.encode()).digest()
+        return {
+            "temperature": round(digest[0] / 255 * 50 - 15, 1),
+            "condition": self.CONDITIONS[digest[1] % len(self.CONDITIONS)],
+        }
+
+    async def close(self):
+        pass
+
+
+class OpenWeatherProvider:
+    URL = "https://api.openweathermap.org/data/2.5/weather"
+
+    def __init__(self, api_key: str, timeout: float = 2.0):
+        self.api_key = api_key
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def fetch(self, city: str) -> Optional[dict]:
+        response = await self.client.get(
+            self.URL,
+            params={"q": city, "appid": self.api_key, "units": "metric"}
+        )
+        if response.status_code == 404:
+            return None
+
+        response.raise_for_status()
+        data = response.json()
+
+        return {
+            "temperature": data["main"]["temp"],
+            "condition": data["weather"][0]["main"] if data.get("weather") else None,
+        }
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class WeatherService:
+    def __init__(self,
+                 provider: WeatherProvider,
+                 cache: Optional[AsyncTTLCache] = None):
+        self.provider = provider
+        self.cache = cache if cache is not None else AsyncTTLCache(maxsize=1000, ttl=600)
+
+    @staticmethod
+    def _key(city: str) -> str:
+        return city.strip().casefold()
+
+    async def lookup(self, city: str) -> Optional[dict]:
+        # shielded: a cancelled job stops waiting, but the fetch still fills the cache for coalesced callers.
+        # Provider errors reach the caller, so the enrichment job is retried; failures are never cached
+        return await asyncio.shield(self.cache.get_or_load(self._key(city), lambda: self.provider.fetch(city)))
+
+    def cached(self, city: Optional[str]) -> Optional[dict]:
+        return self.cache.get(self._key(city)) if city else None
+
+    async def close(self):
+        await self.provider.close()
@@ -1,8 +1,8 @@
-from src.app.api.v1.app import app
+from src.app.api.v1.app import create_app
 
 import uvicorn
 
 if __name__ == "__main__":
     uvicorn.run(
-        app=app
+        app=create_app()
     )
\ No newline at end of file
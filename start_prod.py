@@ -0,0 +1,48 @@
+import os
+import importlib.util
+
+import uvicorn
+
+from src.settings import get_settings
+
+
+def available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def worker_count(configured: int) -> int:
+    if configured > 0:
+        return configured
+
+    # respect CPU affinity / container limits where the platform exposes them
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+if __name__ == "__main__":
+    workers = worker_count(get_settings().SERVER_WORKERS)
+
+    # workers inherit the environment and split DB_MAX_CONNECTIONS by the resolved count; reloading
+    # here fails before anything is spawned when the budget is too small for them
+    os.environ["SERVER_WORKERS"] = str(workers)
+    get_settings.cache_clear()
+    settings = get_settings()
+
+    # every worker builds its own app from the factory and opens its own pool from the lifespan hook
+    uvicorn.run(
+        "src.app.api.v1.app:create_app",
+        factory=True,
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop="uvloop" if available("uvloop") else "asyncio",
+        http="httptools" if available("httptools") else "h11",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        proxy_headers=True,
+        access_log=False
+    )
@@ -0,0 +1,13 @@
+import pytest
+
+from src.settings import Settings
+
+
+@pytest.fixture
+def settings() -> Settings:
+    # nothing here opens the pool, so the database URI is never dialled
+    return Settings(
+        SECRET="test-secret",
+        DATABASE_URI="postgresql://localhost/unused",
+        ACCESS_TOKEN_EXPIRE_MINUTES=5
+    )
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from src.utils.cache import AsyncTTLCache
+
+
+class Loader:
+    def __init__(self, value="value"):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = AsyncTTLCache()
+    loader = Loader()
+
+    callers = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(5)]
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    assert await asyncio.gather(*callers) == ["value"] * 5
+    assert loader.calls == 1
+    assert (cache.misses, cache.coalesced) == (1, 4)
+
+    assert await cache.get_or_load("k", loader) == "value"
+    assert cache.hits == 1
+
+
+async def test_a_failed_load_reaches_every_waiter_and_is_not_cached():
+    cache = AsyncTTLCache()
+    loader = Loader(RuntimeError("provider down"))
+
+    callers = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(3)]
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert loader.calls == 1
+
+    retry = Loader()
+    retry.release.set()
+    assert await cache.get_or_load("k", retry) == "value"
+    assert retry.calls == 1
+
+
+async def test_a_waiter_takes_over_when_the_leader_is_cancelled():
+    cache = AsyncTTLCache()
+    loader = Loader()
+
+    leader = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    assert await waiter == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert loader.calls == 2
+
+
+async def test_a_cancelled_waiter_leaves_the_load_running():
+    cache = AsyncTTLCache()
+    loader = Loader()
+
+    leader = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    loader.release.set()
+    assert await leader == "value"
+    assert cache.get("k") == "value"
+
+
+async def test_invalidate_during_a_load_keeps_the_stale_value_out():
+    cache = AsyncTTLCache()
+    loader = Loader("stale")
+
+    caller = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    cache.invalidate("k")
+    loader.release.set()
+
+    assert await caller == "stale"
+    assert cache.get("k") is None
+
+
+async def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.utils.cache.time.monotonic", lambda: now[0])
+    cache = AsyncTTLCache(ttl=10)
+
+    cache.set("k", "value")
+    now[0] += 9.9
+    assert cache.get("k") == "value"
+
+    now[0] += 0.2
+    assert cache.get("k") is None
+    assert len(cache) == 0
@@ -0,0 +1,115 @@
+import httpx
+import pytest
+
+from uuid import uuid4
+from datetime import datetime, timedelta
+
+from fastapi.exceptions import HTTPException
+
+from src.app.api.v1.app import create_app
+from src.app.api.v1.routers.tasks import etag, version_from_etag
+from src.config.services import Services
+from src.database.errors import TaskNotFoundError, TaskVersionConflictError
+from src.utils.jwt import create_access_token
+
+
+def test_etag_quotes_the_version():
+    assert etag(7) == '"7"'
+
+
+@pytest.mark.parametrize("if_match, version", [
+    (None, None),
+    ("*", None),
+    ('"7"', 7),
+    ('W/"7"', 7),
+    (' "12" ', 12),
+])
+def test_version_from_etag(if_match, version):
+    assert version_from_etag(if_match) == version
+
+
+@pytest.mark.parametrize("if_match", ['"abc"', '"-1"', '""'])
+def test_unusable_etag_is_a_failed_precondition(if_match):
+    with pytest.raises(HTTPException) as raised:
+        version_from_etag(if_match)
+
+    assert raised.value.status_code == 412
+
+
+class VersionedTasks:
+    # a single task, versioned the way the tasks_version trigger does it
+    def __init__(self, task: dict):
+        self.task = task
+
+    async def update_task_for_principal(self, task_id, fields, user_id, is_admin, version=None) -> dict:
+        if task_id != self.task["id"]:
+            raise TaskNotFoundError(task_id)
+
+        if version is not None and version != self.task["version"]:
+            raise TaskVersionConflictError(task_id, self.task["version"])
+
+        self.task.update(fields)
+        self.task["version"] += 1
+        return dict(self.task)
+
+
+@pytest.fixture
+def task() -> dict:
+    return {
+        "id": uuid4(),
+        "user_id": uuid4(),
+        "title": "report",
+        "description": "quarterly",
+        "status": "todo",
+        "created_at": datetime(2026, 1, 1),
+        "city": None,
+        "weather": None,
+        "version": 3,
+    }
+
+
+@pytest.fixture
+async def client(settings, task):
+    services = Services(settings)
+    services.db = VersionedTasks(task)
+
+    token = create_access_token(
+        payload_data={"sub": str(task["user_id"]), "role": "user", "ver": 0, "epoch": 0},
+        expires_data=timedelta(minutes=5),
+        secret=settings.SECRET
+    )
+
+    transport = httpx.ASGITransport(app=create_app(services=services))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        yield client
+
+
+async def test_matching_if_match_updates_and_returns_the_new_etag(client, task):
+    response = await client.patch(f"/tasks/update/{task['id']}", json={"status": "done"}, headers={"If-Match": '"3"'})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"4"'
+    assert response.json()["result"]["status"] == "done"
+
+
+async def test_stale_if_match_is_412_with_the_current_etag(client, task):
+    response = await client.patch(f"/tasks/update/{task['id']}", json={"status": "done"}, headers={"If-Match": '"2"'})
+
+    assert response.status_code == 412
+    assert response.headers["ETag"] == '"3"'
+    assert task["status"] == "todo"
+
+
+async def test_version_in_the_body_wins_over_if_match(client, task):
+    response = await client.patch(f"/tasks/update/{task['id']}", json={"status": "done", "version": 2},
+                                  headers={"If-Match": '"3"'})
+
+    assert response.status_code == 412
+
+
+async def test_without_a_precondition_the_update_is_unconditional(client, task):
+    response = await client.patch(f"/tasks/update/{task['id']}", json={"title": "budget"})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"4"'
@@ -0,0 +1,40 @@
+import json
+import base64
+
+import pytest
+
+from uuid import uuid4
+from datetime import datetime
+
+from src.utils.pagination import encode_cursor, decode_cursor, InvalidCursorError
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    task_id = uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, task_id)) == (created_at, task_id)
+
+
+def test_cursor_is_url_safe_and_unpadded():
+    cursor = encode_cursor(datetime(2026, 1, 1), uuid4())
+
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+def _raw(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    _raw([1, 2]),
+    _raw({"c": "2026-01-01T00:00:00"}),
+    _raw({"c": "yesterday", "i": str(uuid4())}),
+    _raw({"c": "2026-01-01T00:00:00", "i": "not-a-uuid"}),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
@@ -0,0 +1,86 @@
+import pytest
+
+from src.database.queries import build_update_query, build_task_list_query, build_task_search_query, \
+    prefix_tsquery, TASK_COLUMNS
+
+
+def test_update_query_uses_canonical_column_order():
+    name, columns, query = build_update_query(["status", "title"])
+
+    assert columns == ("title", "status")
+    assert name == "update_task:title,status:any"
+    assert query == (
+        "UPDATE tasks SET title = $1, status = $2 "
+        "WHERE id = $3 AND (user_id = $4 OR $5::boolean) "
+        f"RETURNING {TASK_COLUMNS}"
+    )
+
+
+def test_versioned_update_query_checks_the_version_last():
+    name, columns, query = build_update_query({"description": "x"}.keys(), versioned=True)
+
+    assert columns == ("description",)
+    assert name == "update_task:description:versioned"
+    assert "AND version = $5 RETURNING" in query
+
+
+def test_update_query_is_built_once_per_column_set():
+    assert build_update_query(["city", "title"]) is build_update_query(["title", "city"])
+
+
+@pytest.mark.parametrize("columns, message", [
+    (["title", "password_hash"], "unknown column: password_hash"),
+    ([], "no columns to update"),
+])
+def test_update_query_rejects_bad_columns(columns, message):
+    with pytest.raises(ValueError, match=message):
+        build_update_query(columns)
+
+
+def test_list_query_without_filters():
+    name, filters, query = build_task_list_query([])
+
+    assert filters == ()
+    assert name == "list_tasks:-:first:page"
+    assert query == f"SELECT {TASK_COLUMNS} FROM tasks WHERE 1=1 ORDER BY created_at DESC, id DESC LIMIT $1"
+
+
+def test_list_query_numbers_filters_then_cursor_then_limit():
+    name, filters, query = build_task_list_query(["date", "status"], after=True)
+
+    assert filters == ("status", "date")
+    assert name == "list_tasks:status,date:after:page"
+    assert "WHERE status = $1 AND created_at >= $2 AND created_at <= $3 AND (created_at, id) < ($3, $4)" in query
+    assert query.endswith("LIMIT $5")
+
+
+def test_unpaginated_list_query_has_no_limit():
+    name, _, query = build_task_list_query(["user"], paginated=False)
+
+    assert name == "list_tasks:user:first:all"
+    assert "LIMIT" not in query
+
+
+def test_list_query_rejects_unknown_filters():
+    with pytest.raises(ValueError, match="unknown filter: city"):
+        build_task_list_query(["city"])
+
+
+def test_search_query_caps_candidates_before_ranking():
+    name, filters, query = build_task_search_query(["user"])
+
+    assert name == "search_tasks:user"
+    assert filters == ("user",)
+    assert "WHERE (search_vector @@ to_tsquery('simple', $1) OR $2 <% title) AND user_id = $3 LIMIT $4) " \
+           "AS candidates" in query
+    assert query.endswith("ORDER BY rank DESC, created_at DESC, id DESC LIMIT $5 OFFSET $6")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("report", "report:*"),
+    ("  quarterly   report ", "quarterly:* & report:*"),
+    ("it's & (done):*", "it:* & s:* & done:*"),
+    ("!!! ---", None),
+])
+def test_prefix_tsquery_keeps_only_words(text, expected):
+    assert prefix_tsquery(text) == expected
@@ -0,0 +1,79 @@
+import pytest
+
+from src.utils import rate_limit
+from src.utils.rate_limit import InMemoryTokenBucket, RateLimit, RateLimitExceeded
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+async def test_bucket_allows_the_burst_then_asks_to_wait(clock):
+    bucket = InMemoryTokenBucket()
+
+    for _ in range(3):
+        assert await bucket.hit("k", rate=1.0, capacity=3) == 0.0
+
+    assert await bucket.hit("k", rate=1.0, capacity=3) == pytest.approx(1.0)
+
+
+async def test_bucket_refills_at_the_rate_up_to_capacity(clock):
+    bucket = InMemoryTokenBucket()
+    for _ in range(2):
+        await bucket.hit("k", rate=2.0, capacity=2)
+
+    clock.now += 0.25
+    assert await bucket.hit("k", rate=2.0, capacity=2) == pytest.approx(0.25)
+
+    clock.now += 0.5
+    assert await bucket.hit("k", rate=2.0, capacity=2) == 0.0
+
+    # a long idle period refills to capacity, not beyond it
+    clock.now += 60
+    assert [await bucket.hit("k", rate=2.0, capacity=2) for _ in range(3)][-1] > 0
+
+
+async def test_bucket_evicts_the_least_recently_used_key(clock):
+    bucket = InMemoryTokenBucket(max_keys=2)
+
+    await bucket.hit("a", rate=1.0, capacity=1)
+    await bucket.hit("b", rate=1.0, capacity=1)
+    assert await bucket.hit("a", rate=1.0, capacity=1) > 0
+
+    await bucket.hit("c", rate=1.0, capacity=1)
+
+    # "a" was used more recently than "b", so it keeps its drained bucket
+    assert await bucket.hit("a", rate=1.0, capacity=1) > 0
+    assert await bucket.hit("b", rate=1.0, capacity=1) == 0.0
+
+
+async def test_rate_limit_keys_by_name_and_identity(clock):
+    backend = InMemoryTokenBucket()
+    per_user = RateLimit(backend, "user", per_minute=60, burst=1)
+    per_ip = RateLimit(backend, "ip", per_minute=60, burst=1)
+
+    await per_user.check("alice")
+    await per_user.check("bob")
+    await per_ip.check("alice")
+
+    with pytest.raises(RateLimitExceeded) as exceeded:
+        await per_user.check("alice")
+
+    assert exceeded.value.retry_after == pytest.approx(1.0)
+    assert exceeded.value.retry_after_header == "1"
+
+
+def test_retry_after_header_rounds_up_to_whole_seconds():
+    assert RateLimitExceeded(0.01).retry_after_header == "1"
+    assert RateLimitExceeded(2.2).retry_after_header == "3"
@@ -0,0 +1,52 @@
+from uuid import uuid4
+
+from src.utils.revocation import TokenRevocations
+
+
+def test_unknown_users_are_not_revoked():
+    revocations = TokenRevocations()
+
+    assert not revocations.is_revoked(str(uuid4()), 0, 0)
+    assert len(revocations) == 0
+
+
+def test_tokens_below_the_bumped_version_are_revoked():
+    revocations = TokenRevocations()
+    user_id = str(uuid4())
+
+    revocations.revoke_user(user_id, 1)
+
+    assert revocations.is_revoked(user_id, 0, 0)
+    assert not revocations.is_revoked(user_id, 1, 0)
+    assert not revocations.is_revoked(str(uuid4()), 0, 0)
+
+
+def test_known_version_never_moves_backwards():
+    revocations = TokenRevocations()
+    user_id = str(uuid4())
+
+    # a NOTIFY for the second bump can arrive before a reload that still saw the first one
+    revocations.revoke_user(user_id, 2)
+    revocations.revoke_user(user_id, 1)
+
+    assert revocations.is_revoked(user_id, 1, 0)
+    assert not revocations.is_revoked(user_id, 2, 0)
+
+
+def test_user_ids_are_compared_as_strings():
+    revocations = TokenRevocations()
+    user_id = uuid4()
+
+    revocations.revoke_user(user_id, 1)
+
+    assert revocations.is_revoked(str(user_id), 0, 0)
+    assert revocations.is_revoked(user_id, 0, 0)
+    assert len(revocations) == 1
+
+
+def test_bumping_the_epoch_revokes_every_older_token():
+    revocations = TokenRevocations(epoch=3)
+
+    assert revocations.bump_epoch() == 4
+    assert revocations.is_revoked(str(uuid4()), 0, 3)
+    assert not revocations.is_revoked(str(uuid4()), 0, 4)